@@ -5,18 +5,31 @@ Handles speech-to-text conversion and audio quality analysis
 """
 
 import os
+import hashlib
+import io
+import itertools
 import logging
+import multiprocessing
+import queue
+import subprocess
+import threading
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
-import librosa
 import numpy as np
-from flask import Flask, request, jsonify
+import orjson
+import samplerate
+import soundfile as sf
+from flask import Flask, Response, request
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
 # Import our custom utilities
+from utils import fast_ops
 from utils.audio_processor import AudioProcessor
 from utils.speech_to_text import SpeechToTextProcessor
 
@@ -42,8 +55,18 @@ CONFIG = {
     'DEBUG': os.getenv('DEBUG', 'False').lower() == 'true',
     'SAMPLE_RATE': 16000,  # Standard sample rate for speech processing
     'MAX_DURATION': 600,   # Maximum audio duration in seconds (10 minutes)
+    'UPLOAD_CHUNK_SIZE': 1 << 20,  # Read uploads in 1 MiB chunks
+    'INMEM_THRESHOLD': 8 * 1024 * 1024,  # Requests up to this size are decoded from memory
+    'ANALYSIS_WORKERS': int(os.getenv('ANALYSIS_WORKERS', os.cpu_count() or 1)),  # 0 runs analysis in-request
+    'CLEANUP_INTERVAL': 600,  # Seconds between sweeps of stale temp files
+    'FFT_THREADS': int(os.getenv('FFT_THREADS', 1)),  # pyFFTW / scipy.fft threads per transform (nested in sub-analysis threads)
+    'RESULT_CACHE_SIZE': int(os.getenv('RESULT_CACHE_SIZE', 256)),  # Cached analyses keyed by content hash
 }
 
+# Cores each analysis process may use, so per-process thread pools don't oversubscribe the CPU
+CONFIG['THREADS_PER_WORKER'] = max(1, (os.cpu_count() or 1) // max(1, CONFIG['ANALYSIS_WORKERS']))
+CONFIG['SUBANALYSIS_THREADS'] = int(os.getenv('SUBANALYSIS_THREADS', CONFIG['THREADS_PER_WORKER']))  # Per-process threads for quality/speech sub-analyses
+
 # Set max content length
 app.config['MAX_CONTENT_LENGTH'] = CONFIG['MAX_CONTENT_LENGTH']
 
@@ -54,17 +77,53 @@ os.makedirs(CONFIG['UPLOAD_FOLDER'], exist_ok=True)
 audio_processor = None
 speech_to_text = None
 
+# Process pool for CPU-bound analysis (created at startup)
+analysis_executor = None
+
+# Per-process thread pool overlapping STT with quality analysis
+stage_executor = None
+
+def configure_fft_backend() -> bool:
+    """Route librosa's FFTs through pyFFTW (cached plans) when it is installed"""
+    try:
+        import pyfftw
+        import pyfftw.interfaces.numpy_fft
+    except ImportError:
+        logger.info("pyFFTW not installed, librosa will use NumPy's FFT")
+        return False
+    
+    import librosa
+    
+    pyfftw.config.NUM_THREADS = CONFIG['FFT_THREADS']
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(30)
+    librosa.set_fftlib(pyfftw.interfaces.numpy_fft)
+    
+    logger.info(f"✅ librosa FFT backend: pyFFTW ({CONFIG['FFT_THREADS']} threads)")
+    return True
+
 def initialize_models():
     """Initialize audio processing and speech-to-text models"""
-    global audio_processor, speech_to_text
+    global audio_processor, speech_to_text, stage_executor
     
     try:
         logger.info("Initializing audio analysis models...")
         
+        # Threads for running independent analysis stages side by side:
+        # STT (mostly waiting on the engine) plus up to two CPU-bound stages
+        stage_executor = ThreadPoolExecutor(max_workers=1 + min(2, CONFIG['THREADS_PER_WORKER']))
+        
+        # Faster FFT backend for STFT-based features
+        configure_fft_backend()
+        
         # Initialize audio processor
-        audio_processor = AudioProcessor()
+        audio_processor = AudioProcessor(analysis_threads=CONFIG['SUBANALYSIS_THREADS'],
+                                         fft_workers=CONFIG['FFT_THREADS'])
         logger.info("✅ Audio processor initialized")
         
+        # Compile numeric kernels so the first request doesn't pay for JIT
+        fast_ops.warmup()
+        
         # Initialize speech-to-text processor
         speech_to_text = SpeechToTextProcessor()
         logger.info("✅ Speech-to-text processor initialized")
@@ -77,37 +136,207 @@ def initialize_models():
         logger.error(traceback.format_exc())
         return False
 
+class ResultCache:
+    """
+    Bounded LRU of analysis results keyed by upload content digest and request parameters
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: tuple) -> Optional[Dict]:
+        """Return cached result for key, or None"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def put(self, key: tuple, value: Dict):
+        """Store result, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+result_cache = ResultCache(CONFIG['RESULT_CACHE_SIZE'])
+
+# Temp files waiting to be deleted off the request path
+cleanup_queue = queue.Queue()
+
+def schedule_cleanup(file_path: str):
+    """Queue a temp file for deletion by the background cleanup thread"""
+    cleanup_queue.put(file_path)
+
+def _cleanup_worker():
+    """Delete queued temp files as they arrive"""
+    while True:
+        file_path = cleanup_queue.get()
+        try:
+            os.unlink(file_path)
+        except OSError as e:
+            logger.debug(f"Could not remove temp file {file_path}: {str(e)}")
+        finally:
+            cleanup_queue.task_done()
+
+# Unique suffix source for temp upload names
+upload_counter = itertools.count()
+
+def temp_upload_path(original_filename: str) -> tuple:
+    """
+    Build a collision-free temp filename for an upload
+    
+    The extension is taken from the client name already checked by
+    allowed_file; secure_filename can strip it (e.g. non-ASCII names).
+    
+    Args:
+        original_filename: Client-supplied filename
+        
+    Returns:
+        Tuple of (filename, file_path)
+    """
+    stem, extension = original_filename.rsplit('.', 1)
+    filename = f"{os.getpid()}_{next(upload_counter)}_{secure_filename(stem) or 'upload'}.{extension.lower()}"
+    return filename, os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
+
+def save_upload(file, file_path: str) -> str:
+    """
+    Stream an uploaded file to disk, hashing it in the same pass
+    
+    Args:
+        file: Uploaded file from request.files
+        file_path: Destination path
+        
+    Returns:
+        Hex BLAKE2b digest of the file content
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    total_bytes = 0
+    
+    with open(file_path, 'wb') as out:
+        for chunk in iter(lambda: file.stream.read(CONFIG['UPLOAD_CHUNK_SIZE']), b''):
+            total_bytes += len(chunk)
+            if total_bytes > CONFIG['MAX_CONTENT_LENGTH']:
+                break
+            hasher.update(chunk)
+            out.write(chunk)
+    
+    if total_bytes > CONFIG['MAX_CONTENT_LENGTH']:
+        schedule_cleanup(file_path)
+        raise RequestEntityTooLarge()
+    
+    return hasher.hexdigest()
+
+def receive_upload(file) -> tuple:
+    """
+    Take an upload into memory when the request is small, otherwise spill it to disk
+    
+    Args:
+        file: Uploaded file from request.files
+        
+    Returns:
+        Tuple of (filename, source, digest) where source is the upload's
+        bytes or the path of its temp file
+    """
+    filename, file_path = temp_upload_path(file.filename)
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    
+    # MP4 (m4a) keeps its index at the end of the file, so ffmpeg needs a seekable path
+    content_length = request.content_length
+    if content_length is not None and content_length <= CONFIG['INMEM_THRESHOLD'] and extension != 'm4a':
+        data = file.stream.read()
+        return filename, data, hashlib.blake2b(data, digest_size=16).hexdigest()
+    
+    return filename, file_path, save_upload(file, file_path)
+
+def release_upload(source):
+    """Schedule deletion of an upload's temp file; in-memory uploads need nothing"""
+    if isinstance(source, str):
+        schedule_cleanup(source)
+
 def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in CONFIG['ALLOWED_EXTENSIONS']
 
-def load_audio_file(file_path: str) -> tuple:
+def decode_with_ffmpeg(source) -> np.ndarray:
+    """
+    Decode containers libsndfile can't read (webm/m4a/aac) with ffmpeg
+    
+    Args:
+        source: Path to audio file, or its bytes (piped through stdin)
+        
+    Returns:
+        Mono float32 audio at the standard sample rate, at most MAX_DURATION long
+    """
+    in_memory = isinstance(source, bytes)
+    command = [
+        'ffmpeg', '-loglevel', 'error',
+        '-i', 'pipe:0' if in_memory else source,
+        '-t', str(CONFIG['MAX_DURATION']),
+        '-f', 'f32le', '-ac', '1', '-ar', str(CONFIG['SAMPLE_RATE']),
+        'pipe:1'
+    ]
+    if not in_memory:
+        command.insert(1, '-nostdin')
+    result = subprocess.run(command, input=source if in_memory else None,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+def load_audio_file(source) -> tuple:
     """
     Load audio file and return audio data and sample rate
     
     Args:
-        file_path: Path to audio file
+        source: Path to audio file, or the file's bytes for in-memory uploads
         
     Returns:
         Tuple of (audio_data, sample_rate)
     """
     try:
-        # Load audio using librosa
-        audio_data, sample_rate = librosa.load(
-            file_path, 
-            sr=CONFIG['SAMPLE_RATE'],  # Resample to standard rate
-            mono=True  # Convert to mono
-        )
+        in_memory = isinstance(source, bytes)
+        
+        # Probe the header so only what we keep gets decoded
+        try:
+            info = sf.info(io.BytesIO(source) if in_memory else source)
+        except sf.LibsndfileError:
+            info = None
+        
+        if info is None:
+            # Compressed container: ffmpeg downmixes, resamples and stops at MAX_DURATION
+            audio_data, sample_rate = decode_with_ffmpeg(source), CONFIG['SAMPLE_RATE']
+            duration = len(audio_data) / sample_rate
+        else:
+            duration = info.frames / info.samplerate
+            max_frames = int(CONFIG['MAX_DURATION'] * info.samplerate)
+            audio_data, sample_rate = sf.read(io.BytesIO(source) if in_memory else source, frames=min(info.frames, max_frames),
+                                              dtype='float32', always_2d=False)
+            
+            # Convert to mono without leaving float32; stereo averages in place
+            if info.channels == 2:
+                audio_data = np.add(audio_data[:, 0], audio_data[:, 1])
+                audio_data *= 0.5
+            elif info.channels > 2:
+                audio_data = audio_data.mean(axis=1, dtype=np.float32)
+            
+            # Resample to standard rate (libsamplerate) only when needed
+            if sample_rate != CONFIG['SAMPLE_RATE']:
+                audio_data = samplerate.resample(audio_data, CONFIG['SAMPLE_RATE'] / sample_rate, 'sinc_fastest')
+                sample_rate = CONFIG['SAMPLE_RATE']
         
         # Check duration
-        duration = len(audio_data) / sample_rate
         if duration > CONFIG['MAX_DURATION']:
             logger.warning(f"Audio duration {duration:.2f}s exceeds maximum {CONFIG['MAX_DURATION']}s")
             # Truncate to maximum duration
             max_samples = int(CONFIG['MAX_DURATION'] * sample_rate)
             audio_data = audio_data[:max_samples]
         
+        # Keep float32 end to end; analysis results only need single precision
+        audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+        
         logger.info(f"Loaded audio: {duration:.2f}s, {sample_rate}Hz")
         return audio_data, sample_rate
         
@@ -115,10 +344,101 @@ def load_audio_file(file_path: str) -> tuple:
         logger.error(f"Error loading audio file: {str(e)}")
         return None, None
 
+def run_analysis_task(task, *args):
+    """Run an analysis task on the process pool, or inline when the pool is disabled"""
+    if analysis_executor is None:
+        return task(*args)
+    return analysis_executor.submit(task, *args).result()
+
+def run_full_analysis(source, filename: str, params: Dict) -> Optional[Dict]:
+    """
+    Decode, analyze and transcribe one audio file
+    
+    Module-level so it can run inside an analysis worker process, where
+    initialize_models has set up that worker's own processors.
+    
+    Args:
+        source: Path to saved upload, or the upload's bytes
+        filename: Stored filename (used for file type metadata)
+        params: Request parameters (language, include_timestamps, analyze_sentiment)
+        
+    Returns:
+        Response payload, or None if the audio could not be loaded
+    """
+    language = params['language']
+    include_timestamps = params['include_timestamps']
+    
+    # Load audio file
+    audio_data, sample_rate = load_audio_file(source)
+    
+    if audio_data is None:
+        return None
+    
+    # Run STT (network/engine bound) alongside the NumPy-heavy analyses
+    logger.info("Converting speech to text and analyzing audio quality...")
+    stt_future = stage_executor.submit(
+        speech_to_text.transcribe_audio,
+        audio_data, 
+        sample_rate, 
+        language=language,
+        include_timestamps=include_timestamps
+    )
+    
+    # One STFT shared by the quality and speech analyses
+    features = audio_processor.precompute_features(audio_data, sample_rate)
+    quality_future = stage_executor.submit(audio_processor.analyze_audio_quality, audio_data, sample_rate, features)
+    speech_future = stage_executor.submit(audio_processor.analyze_speech_characteristics, audio_data, sample_rate, features)
+    
+    quality_analysis = quality_future.result()
+    speech_analysis = speech_future.result()
+    stt_result = stt_future.result()
+    
+    # Calculate overall quality score
+    overall_quality = calculate_overall_quality(quality_analysis, speech_analysis, stt_result)
+    passed = overall_quality >= CONFIG['QUALITY_THRESHOLD']
+    
+    # Prepare response
+    response = {
+        'success': True,
+        'data': {
+            'transcription': stt_result.get('transcription', ''),
+            'confidence': stt_result.get('confidence', 0.0),
+            'language_detected': stt_result.get('language_detected', language),
+            'word_count': len(stt_result.get('transcription', '').split()),
+            'duration': len(audio_data) / sample_rate,
+            'overall_quality': round(overall_quality, 4),
+            'quality_threshold': CONFIG['QUALITY_THRESHOLD'],
+            'passed': passed,
+            'audio_quality': quality_analysis,
+            'speech_analysis': speech_analysis
+        },
+        'metadata': {
+            'processing_time': datetime.utcnow().isoformat(),
+            'model_version': '1.0.0',
+            'sample_rate': sample_rate,
+            'file_type': filename.rsplit('.', 1)[1].lower()
+        }
+    }
+    
+    # Add timestamps if requested
+    if include_timestamps and 'timestamps' in stt_result:
+        response['data']['timestamps'] = stt_result['timestamps']
+    
+    # Add sentiment analysis if requested and available
+    if params['analyze_sentiment'] and stt_result.get('transcription'):
+        sentiment_result = audio_processor.analyze_sentiment(stt_result['transcription'])
+        response['data']['sentiment_analysis'] = sentiment_result
+    
+    return response
+
+def fast_json(obj: Any) -> Response:
+    """JSON response serialised with orjson; NumPy scalars and arrays are handled natively"""
+    return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY), mimetype='application/json')
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return fast_json({
         'status': 'healthy',
         'service': 'audio-analysis',
         'version': '1.0.0',
@@ -135,7 +455,7 @@ def analyze_audio():
     try:
         # Check if models are loaded
         if not audio_processor or not speech_to_text:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'models_not_initialized',
                 'message': 'Audio analysis models are not loaded'
@@ -143,7 +463,7 @@ def analyze_audio():
         
         # Check if file is present
         if 'file' not in request.files:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'no_file',
                 'message': 'No file provided'
@@ -152,106 +472,63 @@ def analyze_audio():
         file = request.files['file']
         
         if file.filename == '':
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'empty_filename',
                 'message': 'No file selected'
             }), 400
         
         if not allowed_file(file.filename):
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'invalid_file_type',
                 'message': f'Allowed file types: {", ".join(CONFIG["ALLOWED_EXTENSIONS"])}'
             }), 400
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        logger.info(f"Processing audio file: {filename}")
-        
-        # Load audio file
-        audio_data, sample_rate = load_audio_file(file_path)
-        
-        if audio_data is None:
-            # Cleanup file
-            os.remove(file_path)
-            return jsonify({
-                'success': False,
-                'error': 'audio_load_failed',
-                'message': 'Could not load audio file'
-            }), 400
-        
         # Get optional parameters
         language = request.form.get('language', 'en-US')
         include_timestamps = request.form.get('include_timestamps', 'false').lower() == 'true'
         analyze_sentiment = request.form.get('analyze_sentiment', 'true').lower() == 'true'
         
-        # Perform audio quality analysis
-        logger.info("Analyzing audio quality...")
-        quality_analysis = audio_processor.analyze_audio_quality(audio_data, sample_rate)
+        # Receive upload (kept in memory when small)
+        filename, source, digest = receive_upload(file)
         
-        # Perform speech-to-text conversion
-        logger.info("Converting speech to text...")
-        stt_result = speech_to_text.transcribe_audio(
-            audio_data, 
-            sample_rate, 
-            language=language,
-            include_timestamps=include_timestamps
-        )
+        # Return cached analysis for identical uploads
+        cache_key = ('analyze', digest, language, include_timestamps, analyze_sentiment)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached analysis for {file.filename}")
+            release_upload(source)
+            return fast_json(cached)
         
-        # Perform additional audio analysis
-        logger.info("Performing additional audio analysis...")
-        speech_analysis = audio_processor.analyze_speech_characteristics(audio_data, sample_rate)
+        logger.info(f"Processing audio file: {filename}")
         
-        # Cleanup uploaded file
-        try:
-            os.remove(file_path)
-        except:
-            pass
+        # Decode, analyze and transcribe in an analysis worker
+        params = {
+            'language': language,
+            'include_timestamps': include_timestamps,
+            'analyze_sentiment': analyze_sentiment
+        }
+        response = run_analysis_task(run_full_analysis, source, filename, params)
         
-        # Calculate overall quality score
-        overall_quality = calculate_overall_quality(quality_analysis, speech_analysis, stt_result)
-        passed = overall_quality >= CONFIG['QUALITY_THRESHOLD']
+        # Cleanup uploaded file
+        release_upload(source)
         
-        # Prepare response
-        response = {
-            'success': True,
-            'data': {
-                'transcription': stt_result.get('transcription', ''),
-                'confidence': stt_result.get('confidence', 0.0),
-                'language_detected': stt_result.get('language_detected', language),
-                'word_count': len(stt_result.get('transcription', '').split()),
-                'duration': len(audio_data) / sample_rate,
-                'overall_quality': round(float(overall_quality), 4),
-                'quality_threshold': CONFIG['QUALITY_THRESHOLD'],
-                'passed': passed,
-                'audio_quality': quality_analysis,
-                'speech_analysis': speech_analysis
-            },
-            'metadata': {
-                'processing_time': datetime.utcnow().isoformat(),
-                'model_version': '1.0.0',
-                'sample_rate': sample_rate,
-                'file_type': filename.rsplit('.', 1)[1].lower()
-            }
-        }
+        if response is None:
+            return fast_json({
+                'success': False,
+                'error': 'audio_load_failed',
+                'message': 'Could not load audio file'
+            }), 400
         
-        # Add timestamps if requested
-        if include_timestamps and 'timestamps' in stt_result:
-            response['data']['timestamps'] = stt_result['timestamps']
+        result_cache.put(cache_key, response)
         
-        # Add sentiment analysis if requested and available
-        if analyze_sentiment and stt_result.get('transcription'):
-            sentiment_result = audio_processor.analyze_sentiment(stt_result['transcription'])
-            response['data']['sentiment_analysis'] = sentiment_result
+        logger.info(f"Analysis complete: quality={response['data']['overall_quality']:.4f}, "
+                    f"passed={response['data']['passed']}")
+        return fast_json(response)
         
-        logger.info(f"Analysis complete: quality={overall_quality:.4f}, passed={passed}")
-        return jsonify(response)
+    except RequestEntityTooLarge:
+        raise
         
     except Exception as e:
         logger.error(f"Error in audio analysis: {str(e)}")
@@ -259,12 +536,12 @@ def analyze_audio():
         
         # Cleanup file if exists
         try:
-            if 'file_path' in locals():
-                os.remove(file_path)
+            if 'source' in locals():
+                release_upload(source)
         except:
             pass
         
-        return jsonify({
+        return fast_json({
             'success': False,
             'error': 'internal_error',
             'message': 'An internal error occurred during analysis'
@@ -275,14 +552,14 @@ def transcribe_only():
     """Endpoint for speech-to-text conversion only"""
     try:
         if not speech_to_text:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'model_not_loaded',
                 'message': 'Speech-to-text model not loaded'
             }), 500
         
         if 'file' not in request.files:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'no_file',
                 'message': 'No file provided'
@@ -291,34 +568,40 @@ def transcribe_only():
         file = request.files['file']
         
         if not file or file.filename == '' or not allowed_file(file.filename):
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'invalid_file',
                 'message': 'Invalid or no file provided'
             }), 400
         
+        # Get parameters
+        language = request.form.get('language', 'en-US')
+        include_timestamps = request.form.get('include_timestamps', 'false').lower() == 'true'
+        
         # Save and process file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        filename, source, digest = receive_upload(file)
+        
+        # Return cached transcription for identical uploads
+        cache_key = ('transcribe', digest, language, include_timestamps)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            release_upload(source)
+            return fast_json({
+                'success': True,
+                'data': cached
+            })
         
         # Load audio
-        audio_data, sample_rate = load_audio_file(file_path)
+        audio_data, sample_rate = load_audio_file(source)
         
         if audio_data is None:
-            os.remove(file_path)
-            return jsonify({
+            release_upload(source)
+            return fast_json({
                 'success': False,
                 'error': 'audio_load_failed',
                 'message': 'Could not load audio file'
             }), 400
         
-        # Get parameters
-        language = request.form.get('language', 'en-US')
-        include_timestamps = request.form.get('include_timestamps', 'false').lower() == 'true'
-        
         # Transcribe
         result = speech_to_text.transcribe_audio(
             audio_data, 
@@ -328,23 +611,28 @@ def transcribe_only():
         )
         
         # Cleanup
-        os.remove(file_path)
+        release_upload(source)
+        
+        result_cache.put(cache_key, result)
         
-        return jsonify({
+        return fast_json({
             'success': True,
             'data': result
         })
         
+    except RequestEntityTooLarge:
+        raise
+        
     except Exception as e:
         logger.error(f"Error in transcription: {str(e)}")
         
         try:
-            if 'file_path' in locals():
-                os.remove(file_path)
+            if 'source' in locals():
+                release_upload(source)
         except:
             pass
         
-        return jsonify({
+        return fast_json({
             'success': False,
             'error': 'transcription_failed',
             'message': str(e)
@@ -355,14 +643,14 @@ def quality_check():
     """Endpoint for audio quality analysis only"""
     try:
         if not audio_processor:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'model_not_loaded',
                 'message': 'Audio processor not loaded'
             }), 500
         
         if 'file' not in request.files:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'no_file',
                 'message': 'No file provided'
@@ -371,61 +659,74 @@ def quality_check():
         file = request.files['file']
         
         if not file or file.filename == '' or not allowed_file(file.filename):
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'invalid_file',
                 'message': 'Invalid or no file provided'
             }), 400
         
         # Save and process file
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        filename, source, digest = receive_upload(file)
+        
+        # Return cached quality analysis for identical uploads
+        cache_key = ('quality', digest)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            release_upload(source)
+            return fast_json({
+                'success': True,
+                'data': cached
+            })
         
         # Load audio
-        audio_data, sample_rate = load_audio_file(file_path)
+        audio_data, sample_rate = load_audio_file(source)
         
         if audio_data is None:
-            os.remove(file_path)
-            return jsonify({
+            release_upload(source)
+            return fast_json({
                 'success': False,
                 'error': 'audio_load_failed',
                 'message': 'Could not load audio file'
             }), 400
         
-        # Analyze quality
-        quality_analysis = audio_processor.analyze_audio_quality(audio_data, sample_rate)
-        speech_analysis = audio_processor.analyze_speech_characteristics(audio_data, sample_rate)
+        # Analyze quality over one shared spectrogram
+        features = audio_processor.precompute_features(audio_data, sample_rate)
+        quality_analysis = audio_processor.analyze_audio_quality(audio_data, sample_rate, features)
+        speech_analysis = audio_processor.analyze_speech_characteristics(audio_data, sample_rate, features)
         
         # Calculate overall quality
         overall_quality = (quality_analysis.get('overall_score', 0.5) + 
                           speech_analysis.get('overall_score', 0.5)) / 2
         
         # Cleanup
-        os.remove(file_path)
+        release_upload(source)
+        
+        data = {
+            'overall_quality': round(overall_quality, 4),
+            'passed': overall_quality >= CONFIG['QUALITY_THRESHOLD'],
+            'audio_quality': quality_analysis,
+            'speech_analysis': speech_analysis
+        }
+        result_cache.put(cache_key, data)
         
-        return jsonify({
+        return fast_json({
             'success': True,
-            'data': {
-                'overall_quality': round(float(overall_quality), 4),
-                'passed': overall_quality >= CONFIG['QUALITY_THRESHOLD'],
-                'audio_quality': quality_analysis,
-                'speech_analysis': speech_analysis
-            }
+            'data': data
         })
         
+    except RequestEntityTooLarge:
+        raise
+        
     except Exception as e:
         logger.error(f"Error in quality check: {str(e)}")
         
         try:
-            if 'file_path' in locals():
-                os.remove(file_path)
+            if 'source' in locals():
+                release_upload(source)
         except:
             pass
         
-        return jsonify({
+        return fast_json({
             'success': False,
             'error': 'quality_check_failed',
             'message': str(e)
@@ -436,7 +737,7 @@ def batch_analyze():
     """Analyze multiple audio files in batch"""
     try:
         if 'files' not in request.files:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'no_files',
                 'message': 'No files provided'
@@ -444,42 +745,35 @@ def batch_analyze():
         
         files = request.files.getlist('files')
         if not files:
-            return jsonify({
+            return fast_json({
                 'success': False,
                 'error': 'empty_files',
                 'message': 'No files selected'
             }), 400
         
         results = []
+        pending = []  # (result index, cache key, audio_data, sample_rate)
         
         for file in files[:3]:  # Limit to 3 files for batch processing
             if file and file.filename and allowed_file(file.filename):
                 try:
                     # Quick processing for batch
-                    filename = secure_filename(file.filename)
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f"{timestamp}_{filename}"
-                    file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
-                    file.save(file_path)
+                    filename, source, digest = receive_upload(file)
+                    
+                    # Reuse cached result for identical uploads
+                    cache_key = ('batch', digest)
+                    cached = result_cache.get(cache_key)
+                    if cached is not None:
+                        release_upload(source)
+                        results.append(dict(cached, filename=file.filename))
+                        continue
                     
-                    # Load and analyze
-                    audio_data, sample_rate = load_audio_file(file_path)
+                    # Load audio; quality and transcription run once for the whole batch below
+                    audio_data, sample_rate = load_audio_file(source)
                     
                     if audio_data is not None:
-                        # Quick transcription
-                        stt_result = speech_to_text.transcribe_audio(audio_data, sample_rate)
-                        
-                        # Quick quality check
-                        quality_score = audio_processor.quick_quality_check(audio_data, sample_rate)
-                        
-                        results.append({
-                            'filename': file.filename,
-                            'transcription': stt_result.get('transcription', ''),
-                            'confidence': stt_result.get('confidence', 0.0),
-                            'quality_score': quality_score,
-                            'passed': quality_score >= CONFIG['QUALITY_THRESHOLD'],
-                            'duration': len(audio_data) / sample_rate
-                        })
+                        results.append({'filename': file.filename})
+                        pending.append((len(results) - 1, cache_key, audio_data, sample_rate))
                     else:
                         results.append({
                             'filename': file.filename,
@@ -487,7 +781,7 @@ def batch_analyze():
                         })
                     
                     # Cleanup
-                    os.remove(file_path)
+                    release_upload(source)
                     
                 except Exception as e:
                     results.append({
@@ -495,7 +789,27 @@ def batch_analyze():
                         'error': str(e)
                     })
         
-        return jsonify({
+        # Quality-check and transcribe all decoded clips in one batch call each
+        if pending:
+            audio_batch = [audio_data for _, _, audio_data, _ in pending]
+            quality_future = stage_executor.submit(
+                audio_processor.quick_quality_check_batch, audio_batch, CONFIG['SAMPLE_RATE']
+            )
+            stt_results = speech_to_text.transcribe_batch(audio_batch, CONFIG['SAMPLE_RATE'])
+            quality_scores = quality_future.result()
+            
+            for (index, cache_key, audio_data, sample_rate), stt_result, quality_score in zip(
+                    pending, stt_results, quality_scores.tolist()):
+                results[index].update({
+                    'transcription': stt_result.get('transcription', ''),
+                    'confidence': stt_result.get('confidence', 0.0),
+                    'quality_score': quality_score,
+                    'passed': quality_score >= CONFIG['QUALITY_THRESHOLD'],
+                    'duration': len(audio_data) / sample_rate
+                })
+                result_cache.put(cache_key, dict(results[index]))
+        
+        return fast_json({
             'success': True,
             'data': {
                 'results': results,
@@ -506,7 +820,7 @@ def batch_analyze():
         
     except Exception as e:
         logger.error(f"Error in batch analysis: {str(e)}")
-        return jsonify({
+        return fast_json({
             'success': False,
             'error': 'batch_analysis_failed',
             'message': str(e)
@@ -515,7 +829,7 @@ def batch_analyze():
 @app.route('/models/info', methods=['GET'])
 def get_model_info():
     """Get information about loaded models"""
-    return jsonify({
+    return fast_json({
         'success': True,
         'data': {
             'audio_processor': {
@@ -559,7 +873,7 @@ def calculate_overall_quality(quality_analysis: Dict, speech_analysis: Dict, stt
 @app.errorhandler(413)
 def too_large(e):
     """Handle file too large error"""
-    return jsonify({
+    return fast_json({
         'success': False,
         'error': 'file_too_large',
         'message': f'File size exceeds maximum limit of {CONFIG["MAX_CONTENT_LENGTH"] // (1024*1024)}MB'
@@ -568,7 +882,7 @@ def too_large(e):
 @app.errorhandler(404)
 def not_found(e):
     """Handle 404 errors"""
-    return jsonify({
+    return fast_json({
         'success': False,
         'error': 'endpoint_not_found',
         'message': 'Endpoint not found'
@@ -578,7 +892,7 @@ def not_found(e):
 def internal_error(e):
     """Handle internal server errors"""
     logger.error(f"Internal server error: {str(e)}")
-    return jsonify({
+    return fast_json({
         'success': False,
         'error': 'internal_server_error',
         'message': 'An internal server error occurred'
@@ -590,17 +904,29 @@ def cleanup_temp_files():
         import time
         current_time = time.time()
         
-        for filename in os.listdir(CONFIG['UPLOAD_FOLDER']):
-            file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
-            if os.path.isfile(file_path):
-                file_age = current_time - os.path.getmtime(file_path)
-                # Remove files older than 1 hour
-                if file_age > 3600:
-                    os.remove(file_path)
-                    logger.info(f"Cleaned up old temp file: {filename}")
+        with os.scandir(CONFIG['UPLOAD_FOLDER']) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    file_age = current_time - entry.stat(follow_symlinks=False).st_mtime
+                    # Remove files older than 1 hour
+                    if file_age > 3600:
+                        os.unlink(entry.path)
+                        logger.info(f"Cleaned up old temp file: {entry.name}")
     except Exception as e:
         logger.error(f"Error cleaning up temp files: {str(e)}")
 
+def start_background_cleanup():
+    """Start the temp file deletion thread and the periodic stale file sweep"""
+    threading.Thread(target=_cleanup_worker, name='temp-cleanup', daemon=True).start()
+    
+    def sweep():
+        cleanup_temp_files()
+        timer = threading.Timer(CONFIG['CLEANUP_INTERVAL'], sweep)
+        timer.daemon = True
+        timer.start()
+    
+    sweep()
+
 if __name__ == '__main__':
     logger.info("🚀 Starting InterviewX Audio Analysis Service...")
     
@@ -609,8 +935,21 @@ if __name__ == '__main__':
         logger.error("❌ Failed to initialize models. Exiting...")
         exit(1)
     
-    # Clean up old temp files
-    cleanup_temp_files()
+    # Start analysis worker processes, each with its own models. Workers are
+    # started on demand from request threads, so they come from a forkserver:
+    # forking this multi-threaded process (Flask, cleanup, Numba/BLAS threads)
+    # could leave a lock held in the child, and CUDA can't be re-initialized
+    # in a forked child either.
+    if CONFIG['ANALYSIS_WORKERS'] > 0:
+        analysis_executor = ProcessPoolExecutor(
+            max_workers=CONFIG['ANALYSIS_WORKERS'],
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=initialize_models
+        )
+        logger.info(f"⚙️  Started {CONFIG['ANALYSIS_WORKERS']} analysis worker processes")
+    
+    # Clean up old temp files now and periodically; delete request temp files in the background
+    start_background_cleanup()
     
     logger.info(f"🌐 Starting server on {CONFIG['HOST']}:{CONFIG['PORT']}")
     
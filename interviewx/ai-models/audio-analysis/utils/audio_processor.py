@@ -5,32 +5,68 @@ Handles audio quality analysis and speech characteristics
 """
 
 import logging
+import math
+import threading
 import numpy as np
-import librosa
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import traceback
+from dataclasses import dataclass
 
-try:
-    from scipy import signal
-    from scipy.stats import entropy
-    import soundfile as sf
-    from textblob import TextBlob
-except ImportError as e:
-    logging.error(f"Required packages not installed: {e}")
-    raise
+from .fast_ops import rms, basic_stats, frame_energy, find_runs
+from .gpu_ops import get_cuda_device, stft_magnitude
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+@dataclass
+class SentimentResult:
+    """Sentiment of a transcription; orjson serialises it like the equivalent dict"""
+    # Explicit slots (dataclass(slots=True) needs Python 3.10); no field defaults,
+    # since class-level defaults would clash with the slot descriptors
+    __slots__ = ('sentiment', 'polarity', 'subjectivity', 'confidence')
+    sentiment: str
+    polarity: float
+    subjectivity: float
+    confidence: float
+    
+    @classmethod
+    def neutral(cls) -> 'SentimentResult':
+        """Result for empty text or a failed analysis"""
+        return cls('neutral', 0.0, 0.0, 0.0)
+
 class AudioProcessor:
     """
     Audio processing for quality analysis and speech characteristics
     """
     
-    def __init__(self):
-        """Initialize audio processor"""
+    # Frames per windowed-FFT block in _rfft_magnitude
+    STFT_BLOCK_FRAMES = 256
+    
+    # RMS level (dB) below which quick_quality_check treats a clip as silent
+    SILENCE_DB = -60
+    
+    # TextBlob's pattern sentiment analyzer, shared by all instances; created on first sentiment request
+    _sentiment_analyzer = None
+    
+    def __init__(self, analysis_threads: int = 1, use_gpu: Optional[bool] = None,
+                 fft_workers: int = 1):
+        """
+        Initialize audio processor
+        
+        Args:
+            analysis_threads: Threads for running independent sub-analyses
+                concurrently; 1 runs them sequentially
+            use_gpu: Compute spectrograms on CUDA when available; None
+                defers to the AUDIO_USE_GPU environment variable
+            fft_workers: Threads scipy.fft may use per transform (-1 = all cores)
+        """
         self.version = "1.0.0"
         self.sample_rate = 16000
+        self.fft_workers = fft_workers
+        
+        # VAD framing (25 ms frames, 10 ms hop) at the standard rate
+        self._vad_framing = (int(0.025 * self.sample_rate), int(0.01 * self.sample_rate))
         
         # Audio quality thresholds
         self.quality_thresholds = {
@@ -41,15 +77,83 @@ class AudioProcessor:
             'silence_ratio_max': 0.3      # Maximum silence ratio
         }
         
+        # CUDA device for spectrograms (None = CPU/librosa)
+        self.device = get_cuda_device(use_gpu)
+        
+        # Periodic Hann windows by n_fft, built once instead of on every STFT;
+        # 2048 (shared features) and 1024 (quick check) are the sizes in use
+        self._windows = {}
+        for n_fft in (1024, 2048):
+            self._window(n_fft)
+        
+        # Per-thread scratch for windowed FFT blocks (sub-analyses may run concurrently)
+        self._scratch = threading.local()
+        
+        # Stats never change after init; built once, copied out by get_stats
+        self._stats = {
+            'version': self.version,
+            'sample_rate': self.sample_rate,
+            'quality_thresholds': self.quality_thresholds
+        }
+        
+        # Sub-analyses are NumPy/librosa/Numba calls that release the GIL
+        self._executor = ThreadPoolExecutor(max_workers=analysis_threads) if analysis_threads > 1 else None
+        
         logger.info("✅ Audio processor initialized")
     
-    def analyze_audio_quality(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _vad_frames(self, sample_rate: int) -> Tuple[int, int]:
+        """Frame and hop length for voice activity detection; precomputed for the standard rate"""
+        if sample_rate == self.sample_rate:
+            return self._vad_framing
+        return int(0.025 * sample_rate), int(0.01 * sample_rate)
+    
+    def _run_analyses(self, tasks: List[Tuple]) -> List:
+        """Run independent (method, args) sub-analyses, concurrently when a thread pool is configured"""
+        if self._executor is None:
+            return [method(*args) for method, args in tasks]
+        
+        futures = [self._executor.submit(method, *args) for method, args in tasks]
+        return [future.result() for future in futures]
+    
+    def precompute_features(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+        """
+        Compute the features shared by the quality and speech analyses once
+        
+        Args:
+            audio_data: Audio signal array
+            sample_rate: Sample rate of audio
+            
+        Returns:
+            Dictionary with the waveform, its peak amplitude, the magnitude
+            STFT (n_fft=2048, hop_length=512), the 25 ms / 10 ms frame
+            energies used for voice activity detection and their 30th/35th/40th
+            percentile thresholds (None for clips shorter than one frame)
+        """
+        audio_data = audio_data.astype(np.float32, copy=False)
+        frame_energies = frame_energy(audio_data, *self._vad_frames(sample_rate))
+        
+        # Silence (30th), fluency (35th) and speech rate (40th) thresholds from one partition
+        vad_thresholds = None
+        if frame_energies.size:
+            vad_thresholds = dict(zip((30, 35, 40), np.percentile(frame_energies, [30, 35, 40])))
+        
+        return {
+            'wave': audio_data,
+            'peak': max(float(audio_data.max()), -float(audio_data.min())) if len(audio_data) else 0.0,
+            'magnitude': self._stft_magnitude(audio_data, n_fft=2048, hop_length=512),
+            'frame_energies': frame_energies,
+            'vad_thresholds': vad_thresholds
+        }
+    
+    def analyze_audio_quality(self, audio_data: np.ndarray, sample_rate: int,
+                              features: Optional[Dict] = None) -> Dict:
         """
         Comprehensive audio quality analysis
         
         Args:
             audio_data: Audio signal array
             sample_rate: Sample rate of audio
+            features: Output of precompute_features, reused instead of recomputing the STFT and frame energies
             
         Returns:
             Dictionary containing quality metrics
@@ -57,34 +161,40 @@ class AudioProcessor:
         try:
             logger.debug("Starting audio quality analysis...")
             
-            # Normalize audio data
-            if np.max(np.abs(audio_data)) > 0:
-                audio_normalized = audio_data / np.max(np.abs(audio_data))
+            # Single precision is plenty for these metrics and halves STFT/Welch memory traffic
+            audio_data = audio_data.astype(np.float32, copy=False)
+            
+            if features is None:
+                features = self.precompute_features(audio_data, sample_rate)
+            
+            # Normalize audio data; the shared STFT and frame energies are
+            # scaled by the same factor (squared for energy) instead of recomputed
+            peak = features['peak']
+            vad_thresholds = features['vad_thresholds']
+            silence_threshold = vad_thresholds[30] if vad_thresholds else None
+            if peak > 0:
+                audio_normalized = audio_data / peak
+                magnitude = features['magnitude'] / peak
+                frame_energies = features['frame_energies'] / (peak * peak)
+                if silence_threshold is not None:
+                    silence_threshold /= peak * peak
             else:
                 audio_normalized = audio_data
+                magnitude = features['magnitude']
+                frame_energies = features['frame_energies']
             
             # Calculate various quality metrics
             quality_metrics = {}
             
-            # 1. Volume/Amplitude Analysis
-            volume_metrics = self._analyze_volume(audio_normalized)
-            quality_metrics.update(volume_metrics)
-            
-            # 2. Noise Analysis
-            noise_metrics = self._analyze_noise(audio_normalized, sample_rate)
-            quality_metrics.update(noise_metrics)
-            
-            # 3. Frequency Analysis
-            frequency_metrics = self._analyze_frequency_content(audio_normalized, sample_rate)
-            quality_metrics.update(frequency_metrics)
-            
-            # 4. Silence Detection
-            silence_metrics = self._analyze_silence(audio_normalized, sample_rate)
-            quality_metrics.update(silence_metrics)
-            
-            # 5. Audio Distortion
-            distortion_metrics = self._analyze_distortion(audio_normalized)
-            quality_metrics.update(distortion_metrics)
+            # 1-5. Volume, noise, frequency, silence and distortion analyses (independent)
+            for metrics in self._run_analyses([
+                (self._analyze_volume, (audio_normalized,)),
+                (self._analyze_noise, (audio_normalized, sample_rate, magnitude)),
+                (self._analyze_frequency_content, (audio_normalized, sample_rate, magnitude)),
+                (self._analyze_silence, (audio_normalized, sample_rate, frame_energies, silence_threshold)),
+                (self._analyze_distortion, (audio_normalized,))
+            ]):
+                quality_metrics.update(metrics)
             
             # 6. Overall Quality Score
             overall_score = self._calculate_quality_score(quality_metrics)
@@ -99,31 +209,73 @@ class AudioProcessor:
             logger.error(traceback.format_exc())
             return {'overall_score': 0.5, 'error': str(e)}
     
+    def _stft_magnitude(self, audio_data: np.ndarray, n_fft: int, hop_length: int) -> np.ndarray:
+        """Magnitude spectrogram, computed on the GPU when one is available"""
+        if self.device is not None:
+            return stft_magnitude(audio_data, n_fft, hop_length, self.device)
+        
+        import librosa
+        return np.abs(librosa.stft(audio_data, n_fft=n_fft, hop_length=hop_length, window=self._window(n_fft)))
+    
+    def _window(self, n_fft: int) -> np.ndarray:
+        """Periodic Hann window (librosa's default), built once per n_fft"""
+        window = self._windows.get(n_fft)
+        if window is None:
+            # Periodic Hann is the symmetric N + 1 point window without its last sample
+            window = self._windows.setdefault(n_fft, np.hanning(n_fft + 1)[:-1].astype(np.float32))
+        return window
+    
+    def _rfft_magnitude(self, audio_data: np.ndarray, n_fft: int, hop_length: int) -> np.ndarray:
+        """
+        Magnitude spectrogram from scipy.fft over a strided frame view
+        
+        Same centred, zero-padded Hann framing as librosa.stft, laid out as
+        (n_frames, 1 + n_fft // 2). scipy.fft keeps float32 frames in single
+        precision, where librosa goes through NumPy's double-precision FFT.
+        Frames are windowed and transformed in blocks so only the magnitude
+        array is ever full length; the windowed block lives in a reused
+        per-thread scratch buffer.
+        """
+        from scipy import fft
+        
+        padded = np.pad(audio_data, n_fft // 2)
+        frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+        window = self._window(n_fft)
+        
+        scratch = getattr(self._scratch, 'frames', None)
+        if scratch is None or scratch.shape[1] != n_fft:
+            scratch = self._scratch.frames = np.empty((self.STFT_BLOCK_FRAMES, n_fft), dtype=np.float32)
+        
+        magnitude = np.empty((frames.shape[0], n_fft // 2 + 1), dtype=np.float32)
+        for start in range(0, frames.shape[0], self.STFT_BLOCK_FRAMES):
+            block = slice(start, start + self.STFT_BLOCK_FRAMES)
+            windowed = scratch[:len(frames[block])]
+            np.multiply(frames[block], window, out=windowed)
+            np.abs(fft.rfft(windowed, axis=-1, overwrite_x=True, workers=self.fft_workers),
+                   out=magnitude[block])
+        
+        return magnitude
+    
     def _analyze_volume(self, audio_data: np.ndarray) -> Dict:
         """Analyze volume characteristics"""
         try:
-            # RMS (Root Mean Square) energy
-            rms_energy = np.sqrt(np.mean(audio_data ** 2))
-            
-            # Convert to dB
-            rms_db = 20 * np.log10(rms_energy + 1e-10)
+            # RMS (Root Mean Square) energy, peak amplitude, DC offset and quietest
+            # non-zero sample in one pass
+            rms_energy, peak_amplitude, dc_offset, min_nonzero = basic_stats(audio_data)
             
-            # Peak amplitude
-            peak_amplitude = np.max(np.abs(audio_data))
-            peak_db = 20 * np.log10(peak_amplitude + 1e-10)
+            # Convert to dB (scalars: math.log10 skips ufunc dispatch)
+            rms_db = 20 * math.log10(rms_energy + 1e-10)
+            peak_db = 20 * math.log10(peak_amplitude + 1e-10)
             
             # Dynamic range
-            min_amplitude = np.min(np.abs(audio_data[audio_data != 0])) if np.any(audio_data != 0) else 1e-10
-            dynamic_range = peak_db - 20 * np.log10(min_amplitude)
+            min_amplitude = min_nonzero if min_nonzero > 0 else 1e-10
+            dynamic_range = peak_db - 20 * math.log10(min_amplitude)
             
             # Volume consistency (standard deviation of RMS over time)
             frame_length = int(0.1 * len(audio_data))  # 100ms frames
             hop_length = frame_length // 2
             
-            frame_rms = []
-            for i in range(0, len(audio_data) - frame_length, hop_length):
-                frame = audio_data[i:i + frame_length]
-                frame_rms.append(np.sqrt(np.mean(frame ** 2)))
+            frame_rms = np.sqrt(frame_energy(audio_data, frame_length, hop_length) / frame_length)
             
             volume_consistency = 1.0 - (np.std(frame_rms) / (np.mean(frame_rms) + 1e-10))
             
@@ -139,6 +291,7 @@ class AudioProcessor:
                 'rms_db': float(rms_db),
                 'peak_amplitude': float(peak_amplitude),
                 'peak_db': float(peak_db),
+                'dc_offset': float(dc_offset),
                 'dynamic_range': float(dynamic_range),
                 'volume_consistency': float(volume_consistency),
                 'volume_quality': float(volume_quality),
@@ -150,12 +303,15 @@ class AudioProcessor:
             logger.error(f"Error in volume analysis: {str(e)}")
             return {'volume_quality': 0.5}
     
-    def _analyze_noise(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _analyze_noise(self, audio_data: np.ndarray, sample_rate: int,
+                       magnitude: Optional[np.ndarray] = None) -> Dict:
         """Analyze noise characteristics"""
         try:
+            import librosa
+            
             # Spectral noise estimation
-            stft = librosa.stft(audio_data, n_fft=2048, hop_length=512)
-            magnitude = np.abs(stft)
+            if magnitude is None:
+                magnitude = self._stft_magnitude(audio_data, n_fft=2048, hop_length=512)
             
             # Estimate noise floor (bottom 10th percentile of spectral energy)
             noise_floor = np.percentile(magnitude, 10, axis=1, keepdims=True)
@@ -192,9 +348,13 @@ class AudioProcessor:
             logger.error(f"Error in noise analysis: {str(e)}")
             return {'noise_quality': 0.5}
     
-    def _analyze_frequency_content(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _analyze_frequency_content(self, audio_data: np.ndarray, sample_rate: int,
+                                   magnitude: Optional[np.ndarray] = None) -> Dict:
         """Analyze frequency characteristics"""
         try:
+            import librosa
+            from scipy import signal
+            
             # Compute power spectral density
             frequencies, psd = signal.welch(audio_data, sample_rate, nperseg=1024)
             
@@ -206,14 +366,20 @@ class AudioProcessor:
                 'high': (4000, 8000)     # High frequencies (4000-8000 Hz)
             }
             
-            band_energies = {}
-            for band_name, (f_min, f_max) in bands.items():
-                mask = (frequencies >= f_min) & (frequencies <= f_max)
-                band_energy = np.sum(psd[mask])
-                band_energies[f'{band_name}_energy'] = float(band_energy)
+            # Band sums from one cumulative pass; edges are inclusive on both ends
+            cumulative = np.concatenate(([0.0], np.cumsum(psd)))
+            band_edges = np.array(list(bands.values()))
+            lower = np.searchsorted(frequencies, band_edges[:, 0], side='left')
+            upper = np.searchsorted(frequencies, band_edges[:, 1], side='right')
+            band_sums = cumulative[upper] - cumulative[lower]
+            
+            band_energies = {
+                f'{band_name}_energy': float(band_sum)
+                for band_name, band_sum in zip(bands.keys(), band_sums)
+            }
             
             # Total energy
-            total_energy = np.sum(psd)
+            total_energy = cumulative[-1]
             
             # Frequency distribution
             freq_distribution = {}
@@ -223,12 +389,15 @@ class AudioProcessor:
                     band_energies[energy_key] / (total_energy + 1e-10)
                 )
             
+            if magnitude is None:
+                magnitude = self._stft_magnitude(audio_data, n_fft=2048, hop_length=512)
+            
             # Spectral centroid (brightness measure)
-            spectral_centroid = librosa.feature.spectral_centroid(y=audio_data, sr=sample_rate)[0]
+            spectral_centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sample_rate)[0]
             avg_spectral_centroid = np.mean(spectral_centroid)
             
             # Spectral bandwidth
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio_data, sr=sample_rate)[0]
+            spectral_bandwidth = librosa.feature.spectral_bandwidth(S=magnitude, sr=sample_rate)[0]
             avg_spectral_bandwidth = np.mean(spectral_bandwidth)
             
             # Frequency quality (good speech should have balanced mid frequencies)
@@ -252,24 +421,21 @@ class AudioProcessor:
             logger.error(f"Error in frequency analysis: {str(e)}")
             return {'frequency_quality': 0.5}
     
-    def _analyze_silence(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _analyze_silence(self, audio_data: np.ndarray, sample_rate: int,
+                         frame_energies: Optional[np.ndarray] = None,
+                         energy_threshold: Optional[float] = None) -> Dict:
         """Analyze silence characteristics"""
         try:
             # Voice Activity Detection using energy-based approach
-            frame_length = int(0.025 * sample_rate)  # 25ms frames
-            hop_length = int(0.01 * sample_rate)     # 10ms hop
+            frame_length, hop_length = self._vad_frames(sample_rate)  # 25ms frames, 10ms hop
             
             # Calculate frame energy
-            frame_energies = []
-            for i in range(0, len(audio_data) - frame_length, hop_length):
-                frame = audio_data[i:i + frame_length]
-                energy = np.sum(frame ** 2)
-                frame_energies.append(energy)
-            
-            frame_energies = np.array(frame_energies)
+            if frame_energies is None:
+                frame_energies = frame_energy(audio_data, frame_length, hop_length)
             
             # Determine voice activity threshold (dynamic)
-            energy_threshold = np.percentile(frame_energies, 30)  # Bottom 30th percentile
+            if energy_threshold is None:
+                energy_threshold = np.percentile(frame_energies, 30)  # Bottom 30th percentile
             
             # Voice activity detection
             voice_frames = frame_energies > energy_threshold
@@ -302,25 +468,27 @@ class AudioProcessor:
         try:
             # Clipping detection
             clipping_threshold = 0.95
-            clipped_samples = np.sum(np.abs(audio_data) >= clipping_threshold)
+            clipped_samples = (np.count_nonzero(audio_data >= clipping_threshold) +
+                               np.count_nonzero(audio_data <= -clipping_threshold))
             clipping_ratio = clipped_samples / len(audio_data)
             
             # Total Harmonic Distortion (THD) estimation
             # This is a simplified estimation
-            fft = np.fft.fft(audio_data)
-            magnitude = np.abs(fft)
+            # Real input: rfft keeps only the non-negative half of the spectrum
+            n = len(audio_data)
+            magnitude = np.abs(np.fft.rfft(audio_data))
             
             # Find fundamental frequency
-            fundamental_idx = np.argmax(magnitude[:len(magnitude)//2])
+            fundamental_idx = int(np.argmax(magnitude[:n // 2]))
             
             # Estimate harmonics energy vs fundamental
-            harmonic_energy = 0
             fundamental_energy = magnitude[fundamental_idx] ** 2
             
-            for harmonic in range(2, 6):  # Check 2nd to 5th harmonics
-                harmonic_idx = fundamental_idx * harmonic
-                if harmonic_idx < len(magnitude):
-                    harmonic_energy += magnitude[harmonic_idx] ** 2
+            # 2nd to 5th harmonics; indices past Nyquist mirror back as in the full FFT
+            harmonic_idx = fundamental_idx * np.arange(2, 6)
+            harmonic_idx = harmonic_idx[harmonic_idx < n]
+            harmonic_idx = np.where(harmonic_idx > n // 2, n - harmonic_idx, harmonic_idx)
+            harmonic_energy = np.sum(magnitude[harmonic_idx] ** 2)
             
             thd = np.sqrt(harmonic_energy / (fundamental_energy + 1e-10))
             
@@ -389,13 +557,15 @@ class AudioProcessor:
         else:
             return "Very Poor"
     
-    def analyze_speech_characteristics(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def analyze_speech_characteristics(self, audio_data: np.ndarray, sample_rate: int,
+                                       features: Optional[Dict] = None) -> Dict:
         """
         Analyze speech-specific characteristics
         
         Args:
             audio_data: Audio signal array
             sample_rate: Sample rate of audio
+            features: Output of precompute_features, reused instead of recomputing the STFT and frame energies
             
         Returns:
             Dictionary containing speech characteristics
@@ -403,23 +573,24 @@ class AudioProcessor:
         try:
             logger.debug("Analyzing speech characteristics...")
             
-            speech_metrics = {}
-            
-            # 1. Speech rate analysis
-            speech_rate_metrics = self._analyze_speech_rate(audio_data, sample_rate)
-            speech_metrics.update(speech_rate_metrics)
+            audio_data = audio_data.astype(np.float32, copy=False)
             
-            # 2. Pitch analysis
-            pitch_metrics = self._analyze_pitch(audio_data, sample_rate)
-            speech_metrics.update(pitch_metrics)
+            if features is None:
+                features = self.precompute_features(audio_data, sample_rate)
             
-            # 3. Articulation analysis
-            articulation_metrics = self._analyze_articulation(audio_data, sample_rate)
-            speech_metrics.update(articulation_metrics)
+            vad_thresholds = features['vad_thresholds'] or {}
+            speech_metrics = {}
             
-            # 4. Fluency analysis
-            fluency_metrics = self._analyze_fluency(audio_data, sample_rate)
-            speech_metrics.update(fluency_metrics)
+            # 1-4. Speech rate, pitch, articulation and fluency analyses (independent)
+            for metrics in self._run_analyses([
+                (self._analyze_speech_rate, (audio_data, sample_rate, features['frame_energies'],
+                                             vad_thresholds.get(40))),
+                (self._analyze_pitch, (audio_data, sample_rate, features['magnitude'])),
+                (self._analyze_articulation, (audio_data, sample_rate, features['magnitude'])),
+                (self._analyze_fluency, (audio_data, sample_rate, features['frame_energies'],
+                                         vad_thresholds.get(35)))
+            ]):
+                speech_metrics.update(metrics)
             
             # 5. Overall speech score
             overall_score = self._calculate_speech_score(speech_metrics)
@@ -434,40 +605,25 @@ class AudioProcessor:
             logger.error(traceback.format_exc())
             return {'overall_score': 0.5, 'error': str(e)}
     
-    def _analyze_speech_rate(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _analyze_speech_rate(self, audio_data: np.ndarray, sample_rate: int,
+                             frame_energies: Optional[np.ndarray] = None,
+                             energy_threshold: Optional[float] = None) -> Dict:
         """Analyze speech rate and timing"""
         try:
             # Voice activity detection for speech rate
-            frame_length = int(0.025 * sample_rate)
-            hop_length = int(0.01 * sample_rate)
-            
-            frame_energies = []
-            for i in range(0, len(audio_data) - frame_length, hop_length):
-                frame = audio_data[i:i + frame_length]
-                energy = np.sum(frame ** 2)
-                frame_energies.append(energy)
+            frame_length, hop_length = self._vad_frames(sample_rate)
             
-            frame_energies = np.array(frame_energies)
+            if frame_energies is None:
+                frame_energies = frame_energy(audio_data, frame_length, hop_length)
             
             # Voice activity detection
-            energy_threshold = np.percentile(frame_energies, 40)
+            if energy_threshold is None:
+                energy_threshold = np.percentile(frame_energies, 40)
             voice_frames = frame_energies > energy_threshold
             
             # Calculate speech segments
-            speech_segments = []
-            in_speech = False
-            start_frame = 0
-            
-            for i, is_voice in enumerate(voice_frames):
-                if is_voice and not in_speech:
-                    start_frame = i
-                    in_speech = True
-                elif not is_voice and in_speech:
-                    speech_segments.append((start_frame, i))
-                    in_speech = False
-            
-            if in_speech:
-                speech_segments.append((start_frame, len(voice_frames)))
+            segment_starts, _ = find_runs(voice_frames)
+            speech_segments_count = len(segment_starts)
             
             # Calculate speech rate metrics
             total_speech_frames = np.sum(voice_frames)
@@ -479,7 +635,7 @@ class AudioProcessor:
             
             # Speech rate (approximate syllables per second)
             # Estimate syllables from voice segments
-            estimated_syllables = len(speech_segments) * 2  # Rough estimate
+            estimated_syllables = speech_segments_count * 2  # Rough estimate
             speech_rate = estimated_syllables / (speech_duration + 1e-10)
             
             # Ideal speech rate is around 4-6 syllables per second
@@ -494,7 +650,7 @@ class AudioProcessor:
                 'estimated_syllables': int(estimated_syllables),
                 'speech_rate_sps': float(speech_rate),
                 'rate_quality': float(rate_quality),
-                'speech_segments_count': len(speech_segments),
+                'speech_segments_count': speech_segments_count,
                 'is_too_fast': speech_rate > 8,
                 'is_too_slow': speech_rate < 2
             }
@@ -503,26 +659,24 @@ class AudioProcessor:
             logger.error(f"Error in speech rate analysis: {str(e)}")
             return {'rate_quality': 0.5}
     
-    def _analyze_pitch(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _analyze_pitch(self, audio_data: np.ndarray, sample_rate: int,
+                       magnitude: Optional[np.ndarray] = None) -> Dict:
         """Analyze pitch characteristics"""
         try:
-            # Extract pitch using librosa
-            pitches, magnitudes = librosa.piptrack(y=audio_data, sr=sample_rate, 
+            import librosa
+            
+            # Extract pitch using librosa (on the shared 2048/512 spectrogram when given)
+            pitches, magnitudes = librosa.piptrack(y=audio_data, sr=sample_rate, S=magnitude,
                                                   threshold=0.1, fmin=50, fmax=400)
             
-            # Get fundamental frequencies
-            f0_sequence = []
-            for t in range(pitches.shape[1]):
-                index = magnitudes[:, t].argmax()
-                pitch = pitches[index, t]
-                if pitch > 0:
-                    f0_sequence.append(pitch)
+            # Get fundamental frequencies: strongest bin per frame, voiced frames only
+            strongest = magnitudes.argmax(axis=0)
+            f0_candidates = pitches[strongest, np.arange(pitches.shape[1])]
+            f0_sequence = f0_candidates[f0_candidates > 0]
             
-            if not f0_sequence:
+            if f0_sequence.size == 0:
                 return {'pitch_quality': 0.5, 'error': 'No pitch detected'}
             
-            f0_sequence = np.array(f0_sequence)
-            
             # Pitch statistics
             mean_f0 = np.mean(f0_sequence)
             std_f0 = np.std(f0_sequence)
@@ -564,12 +718,15 @@ class AudioProcessor:
             logger.error(f"Error in pitch analysis: {str(e)}")
             return {'pitch_quality': 0.5}
     
-    def _analyze_articulation(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _analyze_articulation(self, audio_data: np.ndarray, sample_rate: int,
+                              magnitude: Optional[np.ndarray] = None) -> Dict:
         """Analyze articulation clarity"""
         try:
+            import librosa
+            
             # Spectral clarity metrics
-            stft = librosa.stft(audio_data, n_fft=2048, hop_length=512)
-            magnitude = np.abs(stft)
+            if magnitude is None:
+                magnitude = self._stft_magnitude(audio_data, n_fft=2048, hop_length=512)
             
             # Spectral clarity (high frequency content indicates clear articulation)
             high_freq_start = int(2000 * magnitude.shape[0] / (sample_rate / 2))
@@ -579,11 +736,11 @@ class AudioProcessor:
             spectral_clarity = high_freq_energy / (total_energy + 1e-10)
             
             # Spectral contrast (difference between peaks and valleys)
-            spectral_contrast = librosa.feature.spectral_contrast(y=audio_data, sr=sample_rate)
+            spectral_contrast = librosa.feature.spectral_contrast(S=magnitude, sr=sample_rate)
             avg_contrast = np.mean(spectral_contrast)
             
             # Spectral rolloff (frequency below which 85% of energy is contained)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=sample_rate, roll_percent=0.85)[0]
+            spectral_rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sample_rate, roll_percent=0.85)[0]
             avg_rolloff = np.mean(spectral_rolloff)
             
             # Articulation quality
@@ -601,58 +758,41 @@ class AudioProcessor:
             logger.error(f"Error in articulation analysis: {str(e)}")
             return {'articulation_quality': 0.5}
     
-    def _analyze_fluency(self, audio_data: np.ndarray, sample_rate: int) -> Dict:
+    def _analyze_fluency(self, audio_data: np.ndarray, sample_rate: int,
+                         frame_energies: Optional[np.ndarray] = None,
+                         energy_threshold: Optional[float] = None) -> Dict:
         """Analyze speech fluency"""
         try:
             # Pause detection and analysis
-            frame_length = int(0.025 * sample_rate)
-            hop_length = int(0.01 * sample_rate)
+            frame_length, hop_length = self._vad_frames(sample_rate)
             
             # Calculate frame energies
-            frame_energies = []
-            for i in range(0, len(audio_data) - frame_length, hop_length):
-                frame = audio_data[i:i + frame_length]
-                energy = np.sum(frame ** 2)
-                frame_energies.append(energy)
-            
-            frame_energies = np.array(frame_energies)
+            if frame_energies is None:
+                frame_energies = frame_energy(audio_data, frame_length, hop_length)
             
             # Voice activity detection
-            energy_threshold = np.percentile(frame_energies, 35)
+            if energy_threshold is None:
+                energy_threshold = np.percentile(frame_energies, 35)
             voice_frames = frame_energies > energy_threshold
             
             # Find pauses (consecutive non-voice frames)
-            pauses = []
-            in_pause = False
-            pause_start = 0
-            
-            for i, is_voice in enumerate(voice_frames):
-                if not is_voice and not in_pause:
-                    pause_start = i
-                    in_pause = True
-                elif is_voice and in_pause:
-                    pause_length = i - pause_start
-                    pauses.append(pause_length)
-                    in_pause = False
-            
-            if in_pause:
-                pauses.append(len(voice_frames) - pause_start)
+            pause_starts, pause_ends = find_runs(~voice_frames)
             
             # Convert pause lengths to seconds
             frame_duration = hop_length / sample_rate
-            pause_durations = [p * frame_duration for p in pauses]
+            pause_durations = (pause_ends - pause_starts) * frame_duration
             
             # Fluency metrics
             total_pauses = len(pause_durations)
             total_duration = len(voice_frames) * frame_duration
             
-            if pause_durations:
+            if pause_durations.size:
                 avg_pause_duration = np.mean(pause_durations)
                 max_pause_duration = np.max(pause_durations)
                 pause_frequency = total_pauses / (total_duration + 1e-10)  # Pauses per second
                 
                 # Count long pauses (> 1 second)
-                long_pauses = sum(1 for p in pause_durations if p > 1.0)
+                long_pauses = int(np.sum(pause_durations > 1.0))
             else:
                 avg_pause_duration = 0
                 max_pause_duration = 0
@@ -730,17 +870,25 @@ class AudioProcessor:
         """Quick quality check for batch processing"""
         try:
             # Simplified quality check
-            rms_energy = np.sqrt(np.mean(audio_data ** 2))
-            rms_db = 20 * np.log10(rms_energy + 1e-10)
+            audio_data = audio_data.astype(np.float32, copy=False)
+            rms_energy = rms(audio_data)
+            rms_db = 20 * math.log10(rms_energy + 1e-10)
+            
+            # Effectively silent: no speech to estimate SNR from, skip the spectrogram
+            if rms_db < self.SILENCE_DB:
+                return 0.5
             
             # Basic volume check
             volume_ok = -40 <= rms_db <= -6
             
-            # Basic SNR estimate
-            stft = librosa.stft(audio_data, n_fft=1024, hop_length=256)
-            magnitude = np.abs(stft)
-            noise_floor = np.percentile(magnitude, 10)
+            # Basic SNR estimate (bin layout is irrelevant for these global statistics)
+            if self.device is not None:
+                magnitude = stft_magnitude(audio_data, 1024, 256, self.device)
+            else:
+                magnitude = self._rfft_magnitude(audio_data, n_fft=1024, hop_length=256)
+            # magnitude is a fresh array used only here: let percentile partition it in place
             signal_level = np.mean(magnitude)
+            noise_floor = np.percentile(magnitude, 10, overwrite_input=True)
             snr = signal_level / (noise_floor + 1e-10)
             snr_ok = snr > 5
             
@@ -757,36 +905,48 @@ class AudioProcessor:
             logger.error(f"Error in quick quality check: {str(e)}")
             return 0.5
     
-    def analyze_sentiment(self, text: str) -> Dict:
+    def quick_quality_check_batch(self, audio_batch: List[np.ndarray], sample_rate: int) -> np.ndarray:
+        """
+        Quick quality check for several clips
+        
+        Args:
+            audio_batch: Audio signal arrays, one per clip
+            sample_rate: Sample rate shared by the clips
+            
+        Returns:
+            float32 array of quality scores, in input order
+        """
+        scores = self._run_analyses([(self.quick_quality_check, (audio_data, sample_rate)) for audio_data in audio_batch])
+        return np.asarray(scores, dtype=np.float32)
+    
+    def analyze_sentiment(self, text: str) -> SentimentResult:
         """Analyze sentiment of transcribed text"""
         try:
-            if not text.strip():
-                return {'sentiment': 'neutral', 'polarity': 0.0, 'subjectivity': 0.0}
+            if not text or text.isspace():
+                return SentimentResult.neutral()
             
-            blob = TextBlob(text)
+            # Deferred: pulls in NLTK, only needed when sentiment is requested
+            if AudioProcessor._sentiment_analyzer is None:
+                from textblob.en.sentiments import PatternAnalyzer
+                AudioProcessor._sentiment_analyzer = PatternAnalyzer()
             
             # Get polarity (-1 to 1) and subjectivity (0 to 1)
-            polarity = blob.sentiment.polarity
-            subjectivity = blob.sentiment.subjectivity
-            
-            # Classify sentiment
-            if polarity > 0.1:
-                sentiment = 'positive'
-            elif polarity < -0.1:
-                sentiment = 'negative'
-            else:
-                sentiment = 'neutral'
+            polarity, subjectivity = self._sentiment_analyzer.analyze(text)
             
-            return {
-                'sentiment': sentiment,
-                'polarity': float(polarity),
-                'subjectivity': float(subjectivity),
-                'confidence': float(abs(polarity))
-            }
+            # Classify sentiment: index 0/1/2 for below -0.1 / within ±0.1 / above 0.1
+            sentiment = ('negative', 'neutral', 'positive')[(polarity > 0.1) - (polarity < -0.1) + 1]
+            
+            # PatternAnalyzer already yields Python floats
+            return SentimentResult(
+                sentiment=sentiment,
+                polarity=polarity,
+                subjectivity=subjectivity,
+                confidence=-polarity if polarity < 0 else polarity
+            )
             
         except Exception as e:
             logger.error(f"Error in sentiment analysis: {str(e)}")
-            return {'sentiment': 'neutral', 'polarity': 0.0, 'subjectivity': 0.0}
+            return SentimentResult.neutral()
     
     def get_version(self) -> str:
         """Get processor version"""
@@ -794,8 +954,4 @@ class AudioProcessor:
     
     def get_stats(self) -> Dict:
         """Get processor statistics"""
-        return {
-            'version': self.version,
-            'sample_rate': self.sample_rate,
-            'quality_thresholds': self.quality_thresholds
-        }
\ No newline at end of file
+        return dict(self._stats)
\ No newline at end of file
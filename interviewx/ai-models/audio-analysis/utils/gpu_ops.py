@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Optional CUDA code path for InterviewX audio analysis
+Computes spectrograms on the GPU with PyTorch when a CUDA device is present
+"""
+
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Hann windows already on the device, by (n_fft, device)
+_windows = {}
+
+def get_cuda_device(use_gpu: Optional[bool] = None) -> Optional["torch.device"]:
+    """
+    Return the CUDA device to run spectral analysis on
+
+    Args:
+        use_gpu: Force the GPU path on or off; None defers to AUDIO_USE_GPU (off unless 'true')
+
+    Returns:
+        torch.device('cuda') when PyTorch is installed, a GPU is visible and
+        the GPU path is enabled; otherwise None (CPU/librosa path)
+    """
+    if use_gpu is None:
+        use_gpu = os.getenv('AUDIO_USE_GPU', 'false').lower() == 'true'
+
+    if not use_gpu:
+        return None
+
+    if torch is None:
+        logger.warning("GPU analysis requested but PyTorch is not installed, using CPU")
+        return None
+
+    if not torch.cuda.is_available():
+        return None
+
+    logger.info(f"✅ Using CUDA device for spectral analysis: {torch.cuda.get_device_name(0)}")
+    return torch.device('cuda')
+
+def stft_magnitude(audio_data: np.ndarray, n_fft: int, hop_length: int,
+                   device: "torch.device") -> np.ndarray:
+    """
+    Magnitude STFT on the GPU, matching librosa.stft defaults
+
+    Uses a periodic Hann window, centred frames and zero padding, so the
+    result has the same (1 + n_fft // 2, n_frames) layout as
+    np.abs(librosa.stft(audio_data, n_fft=n_fft, hop_length=hop_length)).
+    """
+    signal = torch.from_numpy(np.ascontiguousarray(audio_data, dtype=np.float32)).to(device)
+    window = _windows.get((n_fft, device))
+    if window is None:
+        window = _windows.setdefault((n_fft, device), torch.hann_window(n_fft, device=device))
+
+    spectrum = torch.stft(
+        signal,
+        n_fft=n_fft,
+        hop_length=hop_length,
+        window=window,
+        center=True,
+        pad_mode='constant',
+        return_complex=True
+    )
+
+    return spectrum.abs().cpu().numpy()
@@ -6,21 +6,22 @@ Handles speech recognition and transcription with multiple engine support
 
 import logging
 import numpy as np
-import tempfile
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import traceback
 
 try:
     import speech_recognition as sr
-    import soundfile as sf
-    import librosa
-    from pydub import AudioSegment
+    import samplerate
     import webrtcvad
 except ImportError as e:
     logging.error(f"Required packages not installed: {e}")
     raise
 
+from .fast_ops import frame_energy, find_runs, pre_emphasis
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,14 @@ class SpeechToTextProcessor:
     Speech-to-text processing with multiple engine support
     """
     
+    # Concurrent engine requests for transcribe_segments
+    SEGMENT_WORKERS = 8
+    
+    # Language prefixes an engine can recognize; engines not listed take any language
+    ENGINE_LANGUAGES = {
+        'sphinx': ('en',)
+    }
+    
     def __init__(self):
         """Initialize speech-to-text processor"""
         self.version = "1.0.0"
@@ -53,6 +62,7 @@ class SpeechToTextProcessor:
             'no-NO', 'fi-FI', 'cs-CZ', 'hu-HU', 'ro-RO', 'sk-SK', 'sl-SI',
             'hr-HR', 'bg-BG', 'et-EE', 'lv-LV', 'lt-LT', 'mt-MT', 'ga-IE'
         ]
+        self._supported_languages_set = frozenset(self.supported_languages)
         
         # Available engines
         self.engines = {
@@ -66,6 +76,9 @@ class SpeechToTextProcessor:
         # Default engine priority
         self.engine_priority = ['google', 'sphinx', 'wit']
         
+        # Engine availability is fixed for the process lifetime
+        self._available_engines = self._detect_available_engines()
+        
         # VAD for voice activity detection
         self.vad = None
         try:
@@ -74,6 +87,9 @@ class SpeechToTextProcessor:
         except:
             logger.warning("WebRTC VAD not available, using energy-based VAD")
         
+        # Per-thread float/int16 buffers for PCM conversion, grown as needed
+        self._scratch = threading.local()
+        
         logger.info("✅ Speech-to-text processor initialized")
     
     def transcribe_audio(self, audio_data: np.ndarray, sample_rate: int, 
@@ -95,54 +111,41 @@ class SpeechToTextProcessor:
         try:
             logger.debug(f"Starting transcription with engine: {engine}, language: {language}")
             
+            # Whole pipeline runs in float32
+            audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+            
             # Validate language
-            if language not in self.supported_languages:
+            if language not in self._supported_languages_set:
                 logger.warning(f"Language {language} not supported, using en-US")
                 language = 'en-US'
             
             # Preprocess audio
-            processed_audio = self._preprocess_audio(audio_data, sample_rate)
+            processed_audio, processed_rate = self._preprocess_audio(audio_data, sample_rate)
             
             # Convert to audio data that speech_recognition can use
-            audio_file = self._convert_to_wav_temp(processed_audio, sample_rate)
+            audio_sr = self._to_audio_data(processed_audio, processed_rate)
             
-            try:
-                # Load audio with speech_recognition
-                with sr.AudioFile(audio_file) as source:
-                    # Adjust for ambient noise
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    
-                    # Record audio
-                    audio_sr = self.recognizer.record(source)
-                
-                # Choose engine and transcribe
-                if engine == 'auto':
-                    result = self._transcribe_with_fallback(audio_sr, language, include_timestamps)
+            # Choose engine and transcribe
+            if engine == 'auto':
+                result = self._transcribe_with_fallback(audio_sr, language, include_timestamps)
+            else:
+                if engine in self.engines:
+                    result = self.engines[engine](audio_sr, language, include_timestamps)
                 else:
-                    if engine in self.engines:
-                        result = self.engines[engine](audio_sr, language, include_timestamps)
-                    else:
-                        logger.warning(f"Engine {engine} not available, using auto")
-                        result = self._transcribe_with_fallback(audio_sr, language, include_timestamps)
-                
-                # Add metadata
-                result['metadata'] = {
-                    'engine_used': result.get('engine_used', 'unknown'),
-                    'language': language,
-                    'duration': len(audio_data) / sample_rate,
-                    'sample_rate': sample_rate,
-                    'audio_length': len(audio_data)
-                }
-                
-                logger.info(f"Transcription complete: {len(result.get('transcription', ''))} characters")
-                return result
-                
-            finally:
-                # Cleanup temp file
-                try:
-                    os.unlink(audio_file)
-                except:
-                    pass
+                    logger.warning(f"Engine {engine} not available, using auto")
+                    result = self._transcribe_with_fallback(audio_sr, language, include_timestamps)
+            
+            # Add metadata
+            result['metadata'] = {
+                'engine_used': result.get('engine_used', 'unknown'),
+                'language': language,
+                'duration': len(audio_data) / sample_rate,
+                'sample_rate': sample_rate,
+                'audio_length': len(audio_data)
+            }
+            
+            logger.info(f"Transcription complete: {len(result.get('transcription', ''))} characters")
+            return result
                     
         except Exception as e:
             logger.error(f"Error in speech transcription: {str(e)}")
@@ -154,32 +157,40 @@ class SpeechToTextProcessor:
                 'language_detected': language
             }
     
-    def _preprocess_audio(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
-        """Preprocess audio for better recognition"""
+    def _preprocess_audio(self, audio_data: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """Preprocess audio for better recognition, returning (audio, sample_rate)"""
         try:
-            # Normalize audio
-            if np.max(np.abs(audio_data)) > 0:
-                audio_normalized = audio_data / np.max(np.abs(audio_data))
-            else:
-                audio_normalized = audio_data
+            # Peak for normalization; resampling is linear, so the scaling is
+            # applied afterwards together with pre-emphasis
+            audio_f32 = np.ascontiguousarray(audio_data, dtype=np.float32)
+            peak = max(audio_f32.max(), -audio_f32.min())
+            scale = 1.0 / peak if peak > 0 else 1.0
             
             # Resample to 16kHz if needed (standard for speech recognition)
             if sample_rate != 16000:
-                audio_normalized = librosa.resample(audio_normalized, orig_sr=sample_rate, target_sr=16000)
+                audio_f32 = self._resample(audio_f32, sample_rate, 16000)
                 sample_rate = 16000
             
-            # Apply pre-emphasis filter to balance frequency spectrum
-            pre_emphasis = 0.97
-            audio_normalized = np.append(audio_normalized[0], audio_normalized[1:] - pre_emphasis * audio_normalized[:-1])
+            # Normalize and apply pre-emphasis filter to balance frequency spectrum
+            audio_normalized = pre_emphasis(np.ascontiguousarray(audio_f32), 0.97, scale)
             
             # Voice activity detection and trimming
             audio_trimmed = self._trim_silence(audio_normalized, sample_rate)
             
-            return audio_trimmed
+            return audio_trimmed, sample_rate
             
         except Exception as e:
             logger.error(f"Error in audio preprocessing: {str(e)}")
-            return audio_data
+            return audio_data, sample_rate
+    
+    def _resample(self, audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+        """Resample with libsamplerate, falling back to librosa"""
+        try:
+            return samplerate.resample(audio_data, target_sr / orig_sr, 'sinc_fastest')
+        except Exception as e:
+            logger.warning(f"libsamplerate resample failed, using librosa: {str(e)}")
+            import librosa  # Fallback only
+            return librosa.resample(audio_data, orig_sr=orig_sr, target_sr=target_sr)
     
     def _trim_silence(self, audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
         """Remove silence from beginning and end of audio"""
@@ -199,25 +210,28 @@ class SpeechToTextProcessor:
         """Trim silence using WebRTC VAD"""
         try:
             # Convert to 16-bit PCM
-            audio_int16 = (audio_data * 32767).astype(np.int16)
+            audio_int16 = self._pcm16(audio_data)
             
             # Frame settings for VAD
             frame_duration = 30  # ms
             frame_length = int(sample_rate * frame_duration / 1000)
             
-            # Find voice segments
-            voice_frames = []
-            for i in range(0, len(audio_int16) - frame_length, frame_length):
-                frame = audio_int16[i:i + frame_length]
-                is_speech = self.vad.is_speech(frame.tobytes(), sample_rate)
-                voice_frames.append(is_speech)
+            # Find voice segments, slicing frames out of one PCM buffer
+            audio_bytes = audio_int16.tobytes()
+            step = frame_length * 2
+            n_frames = max(0, (len(audio_int16) - 1) // frame_length)
+            voice_frames = np.zeros(n_frames, dtype=bool)
+            is_speech = self.vad.is_speech
+            for f in range(n_frames):
+                offset = f * step
+                voice_frames[f] = is_speech(audio_bytes[offset:offset + step], sample_rate)
             
             # Find start and end of speech
-            if not any(voice_frames):
+            if not voice_frames.any():
                 return audio_data  # No speech detected, return original
             
-            start_frame = next(i for i, is_voice in enumerate(voice_frames) if is_voice)
-            end_frame = len(voice_frames) - 1 - next(i for i, is_voice in enumerate(reversed(voice_frames)) if is_voice)
+            start_frame = int(np.argmax(voice_frames))
+            end_frame = n_frames - 1 - int(np.argmax(voice_frames[::-1]))
             
             # Convert frame indices to sample indices
             start_sample = start_frame * frame_length
@@ -236,16 +250,11 @@ class SpeechToTextProcessor:
             frame_length = 1024
             hop_length = 512
             
-            frame_energies = []
-            for i in range(0, len(audio_data) - frame_length, hop_length):
-                frame = audio_data[i:i + frame_length]
-                energy = np.sum(frame ** 2)
-                frame_energies.append(energy)
+            frame_energies = frame_energy(audio_data, frame_length, hop_length)
             
-            if not frame_energies:
+            if frame_energies.size == 0:
                 return audio_data
             
-            frame_energies = np.array(frame_energies)
             
             # Determine threshold
             threshold = np.percentile(frame_energies, 20)  # Bottom 20th percentile
@@ -271,21 +280,29 @@ class SpeechToTextProcessor:
             logger.error(f"Error in energy-based trimming: {str(e)}")
             return audio_data
     
-    def _convert_to_wav_temp(self, audio_data: np.ndarray, sample_rate: int) -> str:
-        """Convert audio to temporary WAV file"""
-        try:
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            temp_file.close()
-            
-            # Write audio data
-            sf.write(temp_file.name, audio_data, sample_rate)
-            
-            return temp_file.name
-            
-        except Exception as e:
-            logger.error(f"Error creating temp WAV file: {str(e)}")
-            raise
+    def _to_audio_data(self, audio_data: np.ndarray, sample_rate: int) -> "sr.AudioData":
+        """Wrap float audio as 16-bit PCM AudioData without a WAV round trip"""
+        return sr.AudioData(self._pcm16(audio_data).tobytes(), sample_rate, 2)
+    
+    def _pcm16(self, audio_data: np.ndarray) -> np.ndarray:
+        """
+        Clip float audio to [-1, 1] and convert to little-endian int16
+        
+        The result is a view of a per-thread scratch buffer, valid until
+        the same thread converts another clip.
+        """
+        n = len(audio_data)
+        floats = getattr(self._scratch, 'floats', None)
+        if floats is None or floats.size < n:
+            floats = self._scratch.floats = np.empty(n, dtype=np.float32)
+            self._scratch.pcm = np.empty(n, dtype='<i2')
+        
+        scaled = floats[:n]
+        np.clip(audio_data, -1.0, 1.0, out=scaled)
+        scaled *= 32767
+        pcm = self._scratch.pcm[:n]
+        pcm[:] = scaled
+        return pcm
     
     def _transcribe_with_fallback(self, audio_data, language: str, include_timestamps: bool) -> Dict:
         """Transcribe with engine fallback"""
@@ -293,6 +310,11 @@ class SpeechToTextProcessor:
             last_error = None
             
             for engine_name in self.engine_priority:
+                if engine_name not in self._available_engines:
+                    continue
+                if not self._engine_supports(engine_name, language):
+                    continue
+                
                 try:
                     logger.debug(f"Trying engine: {engine_name}")
                     result = self.engines[engine_name](audio_data, language, include_timestamps)
@@ -322,6 +344,11 @@ class SpeechToTextProcessor:
                 'engine_used': 'none'
             }
     
+    def _engine_supports(self, engine_name: str, language: str) -> bool:
+        """Whether an engine can recognize the given language"""
+        prefixes = self.ENGINE_LANGUAGES.get(engine_name)
+        return prefixes is None or language.startswith(prefixes)
+    
     def _transcribe_google(self, audio_data, language: str, include_timestamps: bool) -> Dict:
         """Transcribe using Google Speech Recognition"""
         try:
@@ -491,6 +518,31 @@ class SpeechToTextProcessor:
                 'language_detected': language
             }
     
+    def transcribe_batch(self, audio_batch: List[np.ndarray], sample_rate: int,
+                         language: str = 'en-US') -> List[Dict]:
+        """
+        Transcribe several clips in one call
+        
+        The recognition engines are remote APIs without batched inference,
+        so the clips are sent concurrently instead of one after another.
+        
+        Args:
+            audio_batch: List of audio signal arrays
+            sample_rate: Sample rate shared by all clips
+            language: Language code
+            
+        Returns:
+            List of transcription results, in input order
+        """
+        if not audio_batch:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=len(audio_batch)) as executor:
+            return list(executor.map(
+                lambda audio: self.transcribe_audio(audio, sample_rate, language),
+                audio_batch
+            ))
+    
     def transcribe_segments(self, audio_data: np.ndarray, sample_rate: int,
                           segment_length: float = 30.0, language: str = 'en-US') -> List[Dict]:
         """
@@ -506,21 +558,33 @@ class SpeechToTextProcessor:
             List of transcription results for each segment
         """
         try:
-            segments = []
+            bounds = []
             samples_per_segment = int(segment_length * sample_rate)
             
             for start in range(0, len(audio_data), samples_per_segment):
                 end = min(start + samples_per_segment, len(audio_data))
-                segment_audio = audio_data[start:end]
                 
                 # Skip very short segments
-                if len(segment_audio) < sample_rate * 0.5:  # Less than 0.5 seconds
+                if end - start < sample_rate * 0.5:  # Less than 0.5 seconds
                     continue
                 
+                bounds.append((start, end))
+            
+            if not bounds:
+                return []
+            
+            # Engine calls are network-bound, so segments are sent concurrently
+            with ThreadPoolExecutor(max_workers=min(self.SEGMENT_WORKERS, len(bounds))) as executor:
+                results = list(executor.map(
+                    lambda span: self.transcribe_audio(audio_data[span[0]:span[1]], sample_rate, language),
+                    bounds
+                ))
+            
+            segments = []
+            for (start, end), result in zip(bounds, results):
                 start_time = start / sample_rate
                 end_time = end / sample_rate
                 
-                result = self.transcribe_audio(segment_audio, sample_rate, language)
                 result['start_time'] = start_time
                 result['end_time'] = end_time
                 result['segment_duration'] = end_time - start_time
@@ -555,11 +619,21 @@ class SpeechToTextProcessor:
             
             # Use a small sample for language detection
             sample_length = min(len(audio_data), sample_rate * 10)  # 10 seconds max
-            sample_audio = audio_data[:sample_length]
+            sample_audio = np.ascontiguousarray(audio_data[:sample_length], dtype=np.float32)
+            
+            # Preprocess once and query every candidate language concurrently
+            processed_audio, processed_rate = self._preprocess_audio(sample_audio, sample_rate)
+            audio_sr = self._to_audio_data(processed_audio, processed_rate)
             
-            for lang in test_languages:
+            with ThreadPoolExecutor(max_workers=len(test_languages)) as executor:
+                futures = [
+                    executor.submit(self._transcribe_with_fallback, audio_sr, lang, False)
+                    for lang in test_languages
+                ]
+            
+            for lang, future in zip(test_languages, futures):
                 try:
-                    result = self.transcribe_audio(sample_audio, sample_rate, language=lang)
+                    result = future.result()
                     confidence = result.get('confidence', 0.0)
                     
                     if confidence > best_confidence and result.get('transcription', ''):
@@ -598,45 +672,27 @@ class SpeechToTextProcessor:
                 return []
             
             # Voice activity detection to find speech segments
+            audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
             frame_length = int(0.025 * sample_rate)
             hop_length = int(0.01 * sample_rate)
             
-            frame_energies = []
-            for i in range(0, len(audio_data) - frame_length, hop_length):
-                frame = audio_data[i:i + frame_length]
-                energy = np.sum(frame ** 2)
-                frame_energies.append(energy)
-            
-            frame_energies = np.array(frame_energies)
+            frame_energies = frame_energy(audio_data, frame_length, hop_length)
             threshold = np.percentile(frame_energies, 30)
             voice_frames = frame_energies > threshold
             
             # Find voice segments
-            voice_segments = []
-            in_voice = False
-            start_frame = 0
-            
-            for i, is_voice in enumerate(voice_frames):
-                if is_voice and not in_voice:
-                    start_frame = i
-                    in_voice = True
-                elif not is_voice and in_voice:
-                    voice_segments.append((start_frame, i))
-                    in_voice = False
-            
-            if in_voice:
-                voice_segments.append((start_frame, len(voice_frames)))
+            segment_starts, segment_ends = find_runs(voice_frames)
             
             # Distribute words across voice segments
             word_timestamps = []
             frame_duration = hop_length / sample_rate
             
-            if voice_segments:
-                total_voice_duration = sum((end - start) * frame_duration for start, end in voice_segments)
+            if segment_starts.size:
+                total_voice_duration = int((segment_ends - segment_starts).sum()) * frame_duration
                 time_per_word = total_voice_duration / len(words) if len(words) > 0 else 0
                 
                 current_word = 0
-                current_time = voice_segments[0][0] * frame_duration if voice_segments else 0
+                current_time = int(segment_starts[0]) * frame_duration
                 
                 for word in words:
                     start_time = current_time
@@ -667,6 +723,10 @@ class SpeechToTextProcessor:
     
     def get_available_engines(self) -> List[str]:
         """Get list of available engines"""
+        return self._available_engines.copy()
+    
+    def _detect_available_engines(self) -> List[str]:
+        """Check which engines have their package or credentials present"""
         available = []
         
         # Check which engines are actually available
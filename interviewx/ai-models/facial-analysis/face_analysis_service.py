@@ -6,7 +6,11 @@ Uses MTCNN for face detection and CNN for confidence analysis
 
 import os
 import logging
+import queue
+import threading
+import time
 import traceback
+from concurrent.futures import Future
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
@@ -18,6 +22,11 @@ import torch
 import tensorflow as tf
 from werkzeug.utils import secure_filename
 
+try:
+    import decord
+except ImportError:
+    decord = None
+
 # Import our custom utilities
 from utils.face_detector import FaceDetector
 from utils.confidence_analyzer import ConfidenceAnalyzer
@@ -35,11 +44,15 @@ CORS(app)
 
 # Configuration
 CONFIG = {
-    'UPLOAD_FOLDER': 'temp_uploads',
+    'UPLOAD_FOLDER': os.getenv('UPLOAD_FOLDER', 'temp_uploads'),  # e.g. /dev/shm/interviewx for tmpfs
     'MAX_CONTENT_LENGTH': 50 * 1024 * 1024,  # 50MB max file size
     'ALLOWED_EXTENSIONS': {'mp4', 'avi', 'mov', 'mkv', 'webm', 'jpg', 'jpeg', 'png'},
     'CONFIDENCE_THRESHOLD': 0.8,  # 80% threshold for passing
     'MODEL_PATH': 'models',
+    'USE_TFLITE': os.getenv('FACE_USE_TFLITE', 'False').lower() == 'true',  # INT8 CPU feature extractor
+    'SCORING_BATCH_SIZE': int(os.getenv('FACE_SCORING_BATCH_SIZE', 32)),  # Faces per shared CNN batch
+    'SCORING_MAX_LATENCY': float(os.getenv('FACE_SCORING_MAX_LATENCY', 0.05)),  # Seconds to wait for more faces
+    'DETECTION_CHUNK_FRAMES': 8,  # Frames detected before their faces are handed to the scorer
     'PORT': int(os.getenv('PORT', 5001)),
     'HOST': os.getenv('HOST', '0.0.0.0'),
     'DEBUG': os.getenv('DEBUG', 'False').lower() == 'true'
@@ -52,25 +65,90 @@ app.config['MAX_CONTENT_LENGTH'] = CONFIG['MAX_CONTENT_LENGTH']
 os.makedirs(CONFIG['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(CONFIG['MODEL_PATH'], exist_ok=True)
 
+class ConfidenceBatcher:
+    """
+    Coalesces face crops from concurrent requests into shared CNN batches
+    """
+    
+    def __init__(self, analyze_batch, batch_size: int, max_latency: float):
+        self.analyze_batch = analyze_batch
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True).start()
+    
+    def submit(self, face_images: List[np.ndarray]) -> Future:
+        """Queue face images for scoring; the future resolves to their scores"""
+        future = Future()
+        if not face_images:
+            future.set_result([])
+        else:
+            self._queue.put((face_images, future))
+        return future
+    
+    def predict(self, face_images: List[np.ndarray]) -> List[float]:
+        """Score face images, blocking until their batch has run"""
+        return self.submit(face_images).result()
+    
+    def _worker(self):
+        """Gather queued requests up to batch_size or max_latency, then score them together"""
+        while True:
+            jobs = [self._queue.get()]
+            size = len(jobs[0][0])
+            deadline = time.monotonic() + self.max_latency
+            
+            while size < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                size += len(job[0])
+            
+            try:
+                scores = self.analyze_batch([image for images, _ in jobs for image in images])
+            except Exception as e:
+                logger.error(f"Error in batched confidence scoring: {str(e)}")
+                for _, future in jobs:
+                    future.set_exception(e)
+                continue
+            
+            offset = 0
+            for images, future in jobs:
+                future.set_result(scores[offset:offset + len(images)])
+                offset += len(images)
+
 # Initialize AI components
 face_detector = None
 confidence_analyzer = None
+confidence_batcher = None
 
 def initialize_models():
     """Initialize face detection and confidence analysis models"""
-    global face_detector, confidence_analyzer
+    global face_detector, confidence_analyzer, confidence_batcher
     
     try:
         logger.info("Initializing facial analysis models...")
         
         # Initialize face detector (MTCNN)
         face_detector = FaceDetector()
+        face_detector.warmup()
         logger.info("✅ Face detector (MTCNN) initialized")
         
         # Initialize confidence analyzer (CNN)
-        confidence_analyzer = ConfidenceAnalyzer()
+        confidence_analyzer = ConfidenceAnalyzer(model_path=CONFIG['MODEL_PATH'], use_tflite=CONFIG['USE_TFLITE'])
         logger.info("✅ Confidence analyzer (CNN) initialized")
         
+        # Share CNN batches across concurrent requests
+        confidence_batcher = ConfidenceBatcher(
+            confidence_analyzer.analyze_confidence_batch,
+            batch_size=CONFIG['SCORING_BATCH_SIZE'],
+            max_latency=CONFIG['SCORING_MAX_LATENCY']
+        )
+        
         logger.info("🎯 All facial analysis models ready!")
         return True
         
@@ -84,8 +162,24 @@ def allowed_file(filename: str) -> bool:
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in CONFIG['ALLOWED_EXTENSIONS']
 
+def read_sampled_frames(video_path: str, max_frames: int) -> List[np.ndarray]:
+    """Decode only the sampled frames with decord, already in RGB"""
+    reader = decord.VideoReader(video_path, ctx=decord.cpu(0))
+    step = max(1, len(reader) // max_frames)
+    indices = list(range(0, len(reader), step))[:max_frames]
+    
+    return list(reader.get_batch(indices).asnumpy())
+
 def process_video_frames(video_path: str, max_frames: int = 30) -> List[np.ndarray]:
     """Extract frames from video for analysis"""
+    if decord is not None:
+        try:
+            frames = read_sampled_frames(video_path, max_frames)
+            logger.info(f"Extracted {len(frames)} frames from video")
+            return frames
+        except Exception as e:
+            logger.warning(f"decord could not read video, using OpenCV: {str(e)}")
+    
     try:
         cap = cv2.VideoCapture(video_path)
         frames = []
@@ -95,14 +189,17 @@ def process_video_frames(video_path: str, max_frames: int = 30) -> List[np.ndarr
         
         frame_count = 0
         while cap.isOpened() and len(frames) < max_frames:
-            ret, frame = cap.read()
-            if not ret:
+            # Advance without decoding; only sampled frames are retrieved
+            if not cap.grab():
                 break
                 
             if frame_count % step == 0:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frames.append(frame_rgb)
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                
+                # Convert BGR to RGB in place (retrieve() hands out a fresh array)
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame))
             
             frame_count += 1
         
@@ -114,16 +211,15 @@ def process_video_frames(video_path: str, max_frames: int = 30) -> List[np.ndarr
         logger.error(f"Error processing video: {str(e)}")
         return []
 
-def process_image(image_path: str) -> List[np.ndarray]:
-    """Process single image"""
+def process_image(image_data: bytes) -> List[np.ndarray]:
+    """Process single image, decoded straight from the uploaded bytes"""
     try:
-        image = cv2.imread(image_path)
+        image = cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_COLOR)
         if image is None:
             raise ValueError("Could not load image")
         
-        # Convert BGR to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        return [image_rgb]
+        # Convert BGR to RGB in place
+        return [cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)]
         
     except Exception as e:
         logger.error(f"Error processing image: {str(e)}")
@@ -179,25 +275,26 @@ def analyze_facial_confidence():
                 'message': f'Allowed file types: {", ".join(CONFIG["ALLOWED_EXTENSIONS"])}'
             }), 400
         
-        # Save uploaded file
         filename = secure_filename(file.filename)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        file_path = None
         
         logger.info(f"Processing file: {filename}")
         
-        # Process file based on type
+        # Process file based on type; only videos need a file on disk for the decoder
         file_ext = filename.rsplit('.', 1)[1].lower()
         if file_ext in ['mp4', 'avi', 'mov', 'mkv', 'webm']:
+            file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
+            file.save(file_path)
             frames = process_video_frames(file_path)
         else:
-            frames = process_image(file_path)
+            frames = process_image(file.read())
         
         if not frames:
             # Cleanup file
-            os.remove(file_path)
+            if file_path:
+                os.remove(file_path)
             return jsonify({
                 'success': False,
                 'error': 'processing_failed',
@@ -209,45 +306,56 @@ def analyze_facial_confidence():
         total_confidence = 0
         valid_detections = 0
         
-        for i, frame in enumerate(frames):
-            try:
-                # Detect faces
-                faces = face_detector.detect_faces(frame)
-                
-                if not faces:
-                    logger.warning(f"No faces detected in frame {i}")
-                    continue
-                
-                # Analyze each face
-                for face_data in faces:
-                    face_image = face_data['face_image']
-                    detection_confidence = face_data['confidence']
+        # Detect faces a chunk of frames at a time; each chunk's confident
+        # detections are scored by the batcher while the next chunk is detected
+        chunk_size = CONFIG['DETECTION_CHUNK_FRAMES']
+        scored_chunks = []
+        for chunk_start in range(0, len(frames), chunk_size):
+            accepted_faces = []
+            for i in range(chunk_start, min(chunk_start + chunk_size, len(frames))):
+                try:
+                    # Detect faces
+                    faces = face_detector.detect_faces(frames[i])
                     
-                    # Skip low-confidence detections
-                    if detection_confidence < 0.7:
+                    if not faces:
+                        logger.warning(f"No faces detected in frame {i}")
                         continue
                     
-                    # Analyze confidence
-                    confidence_score = confidence_analyzer.analyze_confidence(face_image)
-                    
-                    analysis_results.append({
-                        'frame_index': i,
-                        'detection_confidence': float(detection_confidence),
-                        'confidence_score': float(confidence_score),
-                        'bbox': face_data['bbox'].tolist() if hasattr(face_data['bbox'], 'tolist') else face_data['bbox'],
-                        'landmarks': face_data.get('landmarks', [])
-                    })
-                    
-                    total_confidence += confidence_score
-                    valid_detections += 1
-                    
-            except Exception as e:
-                logger.error(f"Error analyzing frame {i}: {str(e)}")
-                continue
+                    for face_data in faces:
+                        # Skip low-confidence detections
+                        if face_data['confidence'] >= 0.7:
+                            accepted_faces.append((i, face_data))
+                            
+                except Exception as e:
+                    logger.error(f"Error analyzing frame {i}: {str(e)}")
+                    continue
+            
+            scored_chunks.append((accepted_faces, confidence_batcher.submit(
+                [face_data['face_image'] for _, face_data in accepted_faces]
+            )))
+        
+        scored_faces = [
+            (i, face_data, confidence_score)
+            for accepted_faces, future in scored_chunks
+            for (i, face_data), confidence_score in zip(accepted_faces, future.result())
+        ]
+        
+        for i, face_data, confidence_score in scored_faces:
+            analysis_results.append({
+                'frame_index': i,
+                'detection_confidence': float(face_data['confidence']),
+                'confidence_score': float(confidence_score),
+                'bbox': face_data['bbox'].tolist() if hasattr(face_data['bbox'], 'tolist') else face_data['bbox'],
+                'landmarks': face_data.get('landmarks', [])
+            })
+            
+            total_confidence += confidence_score
+            valid_detections += 1
         
         # Cleanup uploaded file
         try:
-            os.remove(file_path)
+            if file_path:
+                os.remove(file_path)
         except:
             pass
         
@@ -262,6 +370,12 @@ def analyze_facial_confidence():
         overall_confidence = total_confidence / valid_detections
         passed = overall_confidence >= CONFIG['CONFIDENCE_THRESHOLD']
         
+        # Score histogram in NumPy (valid_detections > 0, so the arrays are non-empty)
+        scores = np.fromiter((r['confidence_score'] for r in analysis_results), dtype=np.float64, count=len(analysis_results))
+        detection_confidences = np.fromiter((r['detection_confidence'] for r in analysis_results), dtype=np.float64, count=len(analysis_results))
+        high_count = np.count_nonzero(scores >= 0.8)
+        low_count = np.count_nonzero(scores < 0.6)
+        
         # Prepare response
         response = {
             'success': True,
@@ -271,13 +385,11 @@ def analyze_facial_confidence():
                 'passed': passed,
                 'total_frames_analyzed': len(frames),
                 'valid_detections': valid_detections,
-                'average_detection_confidence': round(
-                    sum(r['detection_confidence'] for r in analysis_results) / len(analysis_results), 4
-                ) if analysis_results else 0,
+                'average_detection_confidence': round(float(detection_confidences.mean()), 4),
                 'analysis_summary': {
-                    'high_confidence_detections': len([r for r in analysis_results if r['confidence_score'] >= 0.8]),
-                    'medium_confidence_detections': len([r for r in analysis_results if 0.6 <= r['confidence_score'] < 0.8]),
-                    'low_confidence_detections': len([r for r in analysis_results if r['confidence_score'] < 0.6])
+                    'high_confidence_detections': high_count,
+                    'medium_confidence_detections': len(scores) - high_count - low_count,
+                    'low_confidence_detections': low_count
                 },
                 'detailed_results': analysis_results[:10]  # Return max 10 detailed results
             },
@@ -297,7 +409,7 @@ def analyze_facial_confidence():
         
         # Cleanup file if exists
         try:
-            if 'file_path' in locals():
+            if locals().get('file_path'):
                 os.remove(file_path)
         except:
             pass
@@ -334,32 +446,35 @@ def batch_analyze():
                 # Process each file using the main analyze logic
                 # This is a simplified version - in production, you'd want to optimize this
                 try:
-                    # Save file temporarily
                     filename = secure_filename(file.filename)
                     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                     filename = f"{timestamp}_{filename}"
-                    file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
-                    file.save(file_path)
+                    file_path = None
                     
-                    # Process file (simplified)
+                    # Process file (simplified); videos are saved temporarily for the decoder
                     file_ext = filename.rsplit('.', 1)[1].lower()
                     if file_ext in ['mp4', 'avi', 'mov', 'mkv', 'webm']:
+                        file_path = os.path.join(CONFIG['UPLOAD_FOLDER'], filename)
+                        file.save(file_path)
                         frames = process_video_frames(file_path, max_frames=10)  # Fewer frames for batch
                     else:
-                        frames = process_image(file_path)
+                        frames = process_image(file.read())
                     
                     if frames:
                         # Quick analysis
                         face_count = 0
                         confidence_sum = 0
                         
-                        for frame in frames[:3]:  # Analyze first 3 frames only
-                            faces = face_detector.detect_faces(frame)
-                            for face_data in faces:
-                                if face_data['confidence'] >= 0.7:
-                                    confidence_score = confidence_analyzer.analyze_confidence(face_data['face_image'])
-                                    confidence_sum += confidence_score
-                                    face_count += 1
+                        face_images = [
+                            face_data['face_image']
+                            for faces in face_detector.detect_faces_batch(frames[:3])  # Analyze first 3 frames only
+                            for face_data in faces
+                            if face_data['confidence'] >= 0.7
+                        ]
+                        
+                        for confidence_score in confidence_batcher.predict(face_images):
+                            confidence_sum += confidence_score
+                            face_count += 1
                         
                         avg_confidence = confidence_sum / face_count if face_count > 0 else 0
                         
@@ -376,7 +491,8 @@ def batch_analyze():
                         })
                     
                     # Cleanup
-                    os.remove(file_path)
+                    if file_path:
+                        os.remove(file_path)
                     
                 except Exception as e:
                     results.append({
@@ -10,6 +10,7 @@ import cv2
 from typing import Dict, List, Optional, Tuple
 import traceback
 import os
+import threading
 
 try:
     import tensorflow as tf
@@ -30,14 +31,22 @@ class ConfidenceAnalyzer:
     Confidence analysis using CNN-based facial expression and feature analysis
     """
     
-    def __init__(self, model_path: str = "models"):
+    # Confidence weight per emotion: happy, confident, neutral, nervous, sad, angry
+    EMOTION_CONFIDENCE_WEIGHTS = np.array([0.8, 1.0, 0.6, 0.2, 0.3, 0.4])
+    
+    # INT8 feature extractor written by export_int8_feature_extractor
+    TFLITE_FEATURE_EXTRACTOR = 'feature_extractor_int8.tflite'
+    
+    def __init__(self, model_path: str = "models", use_tflite: bool = False):
         """
         Initialize confidence analyzer
         
         Args:
             model_path: Path to model files
+            use_tflite: Run feature extraction on the INT8 TFLite model when present
         """
         self.model_path = model_path
+        self.use_tflite = use_tflite
         self.version = "1.0.0"
         
         # Model components
@@ -46,8 +55,17 @@ class ConfidenceAnalyzer:
         self.emotion_classifier = None
         self.scaler = None
         
+        # Traced inference functions, keyed by model name
+        self._infer = {}
+        
+        # Optional INT8 TFLite feature extractor (interpreter is not thread-safe)
+        self._tflite = None
+        self._tflite_lock = threading.Lock()
+        self._tflite_input_shape = None
+        
         # Confidence database (pre-computed confident face features)
         self.confident_face_database = None
+        self._database_unit = None  # Non-zero rows scaled to unit length
         self.confidence_threshold = 0.8
         
         # Feature dimensions
@@ -76,6 +94,12 @@ class ConfidenceAnalyzer:
             # Initialize scaler
             self._initialize_scaler()
             
+            # Trace inference graphs once so requests never retrace
+            self._build_inference_functions()
+            
+            if self.use_tflite:
+                self._load_tflite_feature_extractor()
+            
             logger.info("✅ All confidence analysis models initialized")
             
         except Exception as e:
@@ -223,6 +247,93 @@ class ConfidenceAnalyzer:
             logger.error(f"❌ Failed to create emotion classifier: {str(e)}")
             raise
     
+    def _build_inference_functions(self):
+        """Wrap each model in a tf.function with a dynamic batch dimension"""
+        models = {
+            'feature_extractor': self.feature_extractor,
+            'confidence_classifier': self.confidence_classifier,
+            'emotion_classifier': self.emotion_classifier
+        }
+        
+        for name, model in models.items():
+            spec = tf.TensorSpec(shape=(None,) + tuple(model.input_shape[1:]), dtype=tf.float32)
+            infer = tf.function(lambda x, model=model: model(x, training=False), input_signature=[spec])
+            infer.get_concrete_function()
+            self._infer[name] = infer
+        
+        logger.info("✅ Inference functions traced")
+    
+    def _load_tflite_feature_extractor(self):
+        """Load the quantized feature extractor, keeping the Keras one if it is missing"""
+        try:
+            tflite_path = os.path.join(self.model_path, self.TFLITE_FEATURE_EXTRACTOR)
+            
+            if not os.path.exists(tflite_path):
+                logger.warning(f"TFLite feature extractor not found at {tflite_path}, using Keras model")
+                return
+            
+            interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=os.cpu_count())
+            interpreter.allocate_tensors()
+            self._tflite = interpreter
+            self._tflite_input_shape = tuple(interpreter.get_input_details()[0]['shape'])
+            
+            logger.info("✅ INT8 TFLite feature extractor loaded")
+            
+        except Exception as e:
+            logger.warning(f"Failed to load TFLite feature extractor: {str(e)}")
+            self._tflite = None
+    
+    def export_int8_feature_extractor(self, face_images: List[np.ndarray]) -> str:
+        """
+        Quantize the feature extractor to INT8 TFLite (one-time, offline)
+        
+        Args:
+            face_images: Representative face crops (~100) for calibration
+            
+        Returns:
+            Path of the written .tflite model
+        """
+        def representative_dataset():
+            for face_image in face_images:
+                if face_image.shape != (224, 224, 3):
+                    face_image = cv2.resize(face_image, (224, 224))
+                yield [np.expand_dims(face_image.astype(np.float32) / 255.0, axis=0)]
+        
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.feature_extractor)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        
+        tflite_path = os.path.join(self.model_path, self.TFLITE_FEATURE_EXTRACTOR)
+        with open(tflite_path, 'wb') as f:
+            f.write(converter.convert())
+        
+        logger.info(f"✅ INT8 feature extractor written to {tflite_path}")
+        return tflite_path
+    
+    def _run_tflite(self, inputs: np.ndarray) -> np.ndarray:
+        """Run the TFLite feature extractor on a whole batch in one invoke"""
+        input_index = self._tflite.get_input_details()[0]['index']
+        output_index = self._tflite.get_output_details()[0]['index']
+        
+        with self._tflite_lock:
+            # Re-plan tensors only when the batch size changes
+            if inputs.shape != self._tflite_input_shape:
+                self._tflite.resize_tensor_input(input_index, inputs.shape)
+                self._tflite.allocate_tensors()
+                self._tflite_input_shape = inputs.shape
+            
+            self._tflite.set_tensor(input_index, np.ascontiguousarray(inputs))
+            self._tflite.invoke()
+            return self._tflite.get_tensor(output_index).copy()
+    
+    def _run_model(self, name: str, inputs: np.ndarray) -> np.ndarray:
+        """Run a traced model on a float32 batch"""
+        if name == 'feature_extractor' and self._tflite is not None:
+            return self._run_tflite(np.asarray(inputs, dtype=np.float32))
+        
+        return self._infer[name](tf.convert_to_tensor(inputs, dtype=tf.float32)).numpy()
+    
     def _initialize_scaler(self):
         """Initialize feature scaler"""
         try:
@@ -254,6 +365,11 @@ class ConfidenceAnalyzer:
         except Exception as e:
             logger.warning(f"Failed to load confident face database: {str(e)}")
             self._create_mock_confident_database()
+        
+        # Normalize once so similarity is a single matrix product per request
+        norms = np.linalg.norm(self.confident_face_database, axis=1)
+        valid = norms > 0
+        self._database_unit = self.confident_face_database[valid] / norms[valid, np.newaxis]
     
     def _create_mock_confident_database(self):
         """Create a mock database of confident face features"""
@@ -301,7 +417,7 @@ class ConfidenceAnalyzer:
             face_batch = np.expand_dims(face_image, axis=0)
             
             # Extract features
-            features = self.feature_extractor.predict(face_batch, verbose=0)
+            features = self._run_model('feature_extractor', face_batch)
             
             # Flatten if needed
             if len(features.shape) > 2:
@@ -365,6 +481,82 @@ class ConfidenceAnalyzer:
             logger.error(f"Error analyzing confidence: {str(e)}")
             return 0.0
     
+    def extract_features_batch(self, face_images: List[np.ndarray]) -> np.ndarray:
+        """
+        Extract features from several face images in one forward pass
+        
+        Args:
+            face_images: List of face images
+            
+        Returns:
+            Feature matrix of shape (len(face_images), feature_dim)
+        """
+        # Preprocess images into one normalized batch
+        face_batch = np.stack([
+            face_image if face_image.shape == (224, 224, 3) else cv2.resize(face_image, (224, 224))
+            for face_image in face_images
+        ]).astype(np.float32)
+        face_batch *= 1.0 / 255.0
+        
+        # Extract features
+        features = self._run_model('feature_extractor', face_batch)
+        
+        # Flatten if needed
+        return features.reshape(features.shape[0], -1)
+    
+    def analyze_confidence_batch(self, face_images: List[np.ndarray]) -> List[float]:
+        """
+        Analyze confidence levels for several face images at once
+        
+        The CNN models run once over the whole batch instead of once per face.
+        
+        Args:
+            face_images: List of face images
+            
+        Returns:
+            Confidence scores (0.0 to 1.0), in input order
+        """
+        if not face_images:
+            return []
+        
+        # Each method falls back to a neutral 0.5 column on its own, as the
+        # single-image methods do, so one failure never zeroes the batch
+        neutral = np.full(len(face_images), 0.5)
+        classifier_scores = similarity_scores = emotion_scores = neutral
+        
+        try:
+            features = self.extract_features_batch(face_images)
+        except Exception as e:
+            logger.error(f"Error extracting batch features: {str(e)}")
+            features = None
+        
+        if features is not None:
+            # Method 1: Direct confidence classification
+            try:
+                features_scaled = self.scaler.transform(features) if hasattr(self.scaler, 'mean_') else features
+                classifier_scores = self._run_model('confidence_classifier', features_scaled)[:, 0]
+            except Exception as e:
+                logger.error(f"Error in batch confidence classification: {str(e)}")
+            
+            # Method 2: Similarity to confident face database
+            similarity_scores = self._compare_to_confident_database_batch(features)
+            
+            # Method 3: Emotion-based confidence
+            try:
+                emotion_probs = self._run_model('emotion_classifier', features)
+                emotion_scores = np.clip(emotion_probs @ self.EMOTION_CONFIDENCE_WEIGHTS, 0.0, 1.0)
+            except Exception as e:
+                logger.error(f"Error in batch emotion-based confidence analysis: {str(e)}")
+        
+        # Method 4: Facial feature analysis
+        feature_scores = np.array([self._analyze_facial_features(face_image) for face_image in face_images])
+        
+        # Combine scores with weights
+        final_confidence = (0.4 * classifier_scores + 0.3 * similarity_scores +
+                            0.2 * emotion_scores + 0.1 * feature_scores)
+        
+        return np.clip(final_confidence, 0.0, 1.0).tolist()
+    
     def _classify_confidence(self, features: np.ndarray) -> float:
         """Classify confidence using neural network"""
         try:
@@ -376,7 +568,7 @@ class ConfidenceAnalyzer:
                 features_scaled = self.scaler.transform(features_scaled)
             
             # Predict confidence
-            confidence = self.confidence_classifier.predict(features_scaled, verbose=0)[0][0]
+            confidence = self._run_model('confidence_classifier', features_scaled)[0][0]
             
             return float(confidence)
             
@@ -386,39 +578,41 @@ class ConfidenceAnalyzer:
     
     def _compare_to_confident_database(self, features: np.ndarray) -> float:
         """Compare features to confident face database"""
-        try:
-            if self.confident_face_database is None:
-                return 0.5
-            
-            # Calculate similarity to all confident faces
-            similarities = []
+        return float(self._compare_to_confident_database_batch(features.reshape(1, -1))[0])
+    
+    def _compare_to_confident_database_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Compare feature rows to confident face database
+        
+        Args:
+            features: Feature matrix of shape (N, feature_dim)
             
-            for confident_features in self.confident_face_database:
-                # Cosine similarity
-                norm_a = np.linalg.norm(features)
-                norm_b = np.linalg.norm(confident_features)
-                
-                if norm_a > 0 and norm_b > 0:
-                    similarity = np.dot(features, confident_features) / (norm_a * norm_b)
-                    similarities.append(similarity)
+        Returns:
+            Similarity-based confidence per row (0.5 where undefined)
+        """
+        scores = np.full(len(features), 0.5)
+        
+        try:
+            if self._database_unit is None or len(self._database_unit) == 0:
+                return scores
             
-            if not similarities:
-                return 0.5
+            # Cosine similarity to all confident faces in one matrix product
+            norms = np.linalg.norm(features, axis=1)
+            valid = norms > 0
+            similarities = (features[valid] / norms[valid, np.newaxis]) @ self._database_unit.T
             
             # Use average of top 10% similarities
-            similarities = sorted(similarities, reverse=True)
-            top_similarities = similarities[:max(1, len(similarities) // 10)]
-            
-            avg_similarity = np.mean(top_similarities)
+            top_k = max(1, similarities.shape[1] // 10)
+            avg_similarity = np.partition(similarities, -top_k, axis=1)[:, -top_k:].mean(axis=1)
             
             # Convert similarity to confidence score
-            confidence = (avg_similarity + 1) / 2  # Scale from [-1,1] to [0,1]
+            scores[valid] = np.clip((avg_similarity + 1) / 2, 0.0, 1.0)  # Scale from [-1,1] to [0,1]
             
-            return float(np.clip(confidence, 0.0, 1.0))
+            return scores
             
         except Exception as e:
             logger.error(f"Error comparing to confident database: {str(e)}")
-            return 0.5
+            return scores
     
     def _analyze_emotion_confidence(self, features: np.ndarray) -> float:
         """Analyze confidence based on emotion classification"""
@@ -427,26 +621,10 @@ class ConfidenceAnalyzer:
             features_input = features.reshape(1, -1)
             
             # Predict emotions
-            emotion_probs = self.emotion_classifier.predict(features_input, verbose=0)[0]
-            
-            # Emotion labels: happy, confident, neutral, nervous, sad, angry
-            emotion_labels = ['happy', 'confident', 'neutral', 'nervous', 'sad', 'angry']
+            emotion_probs = self._run_model('emotion_classifier', features_input)[0]
             
             # Calculate confidence based on emotion probabilities
-            confidence_weights = {
-                'happy': 0.8,
-                'confident': 1.0,
-                'neutral': 0.6,
-                'nervous': 0.2,
-                'sad': 0.3,
-                'angry': 0.4
-            }
-            
-            emotion_confidence = 0.0
-            for i, prob in enumerate(emotion_probs):
-                emotion = emotion_labels[i]
-                weight = confidence_weights.get(emotion, 0.5)
-                emotion_confidence += prob * weight
+            emotion_confidence = emotion_probs @ self.EMOTION_CONFIDENCE_WEIGHTS
             
             return float(np.clip(emotion_confidence, 0.0, 1.0))
             
@@ -606,7 +784,7 @@ class ConfidenceAnalyzer:
             feature_score = self._analyze_facial_features(face_image)
             
             # Get emotion probabilities
-            emotion_probs = self.emotion_classifier.predict(features.reshape(1, -1), verbose=0)[0]
+            emotion_probs = self._run_model('emotion_classifier', features.reshape(1, -1))[0]
             emotion_labels = ['happy', 'confident', 'neutral', 'nervous', 'sad', 'angry']
             
             # Overall confidence
@@ -313,19 +313,24 @@ class FaceDetector:
         Returns:
             List of face detection results for each image
         """
-        try:
-            results = []
-            
-            for i, image in enumerate(images):
+        results = []
+        
+        for i, image in enumerate(images):
+            # A failing image gets an empty entry so indices stay aligned
+            try:
                 logger.debug(f"Processing image {i+1}/{len(images)}")
                 faces = self.detect_faces(image)
-                results.append(faces)
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Error in batch face detection: {str(e)}")
-            return []
+            except Exception as e:
+                logger.error(f"Error in batch face detection for image {i}: {str(e)}")
+                faces = []
+            results.append(faces)
+        
+        return results
+    
+    def warmup(self):
+        """Run one detection on a blank frame so the first request skips graph setup"""
+        self.detect_faces(np.zeros((224, 224, 3), dtype=np.uint8))
+        logger.info("✅ MTCNN detector warmed up")
     
     def get_face_count(self, image: np.ndarray) -> int:
         """